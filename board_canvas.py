@@ -1,11 +1,14 @@
 import time
 import tkinter as tk
+from math import ceil
 from typing import List
 from colours import *
 from PIL import Image as PILImage
 from shared_widgets import *
-from utilities import resize_image, _draw_image_test
-from dataclasses import dataclass
+from utilities import LRUCache, resize_image, _draw_image_test
+from item_positions import ItemPositions
+from canvas_items import CanvasBoardItem, CanvasNote, CanvasPage
+from view_transform import ViewTransform
 import models
 """
 The board_canvas file and BoardCanvas (BC) class is responsible for the canvas UI component AND its board items
@@ -16,11 +19,12 @@ The BC can be thought of as the View component in MVC pattern, where the BoardHa
 
 
 class BoardCanvas(tk.Canvas):
-    # Using dataclass with __slots__ for optimal attribute access time
-    @dataclass(slots=True)
-    class ZoomPoint:
-        x: int
-        y: int
+    # Notes and pages are drawn as canvas primitives ("canvas") rather than as Tk widgets ("widget")
+    canvas_renderer = utils.get_setting("ITEM_RENDERER", "canvas") == "canvas"
+
+    # Background textures resized for each zoom scale, shared by every canvas. The zoom range only has
+    # 13 distinct scales, so zooming back and forth is a cache lookup once each scale has been visited
+    textures = LRUCache(16)
 
     def __init__(self, parent, side_pannel, item_models=[]):
         super().__init__(parent, background=ORANGE, highlightthickness=0)
@@ -28,56 +32,68 @@ class BoardCanvas(tk.Canvas):
         self.previously_opened = False
         self.img = None
         self.photo_image = None
+
+        # Background tiles: a pool of canvas image items that are moved around instead of being recreated
+        self.tiles: List[int] = []
+        self.tile_positions: List[tuple] = []
+        self.tile_image = None
         self.width = 0
         self.height = 0
 
         self.side_panel: MainSidePanelFrame = side_pannel
-        self.board_items: List[BoardItemWidget] = []
+        self.board_items: List[BoardItemView] = []
+        # World positions and sizes of the item widgets, which register themselves when they are created. Areas are
+        # queried through its spatial index, and the items to place are projected together
+        self.item_positions = ItemPositions()
+        self.shown_items: set[BoardItemView] = set()
+
+        # Tag filter: the IDs of the items matching the active filter (None when no filter is applied). Items that
+        # don't match are either dimmed or left out of the visible items entirely, depending on the filter mode
+        self.tag_filter: set[int] = None
+        self.filter_mode = "dim"
+
+        # Distance every board item has been moved by with a single canvas move while panning. Items store their
+        # screen position relative to it (see BoardItemView.scaled_x)
+        self.item_shift_x = 0
+        self.item_shift_y = 0
         if item_models:
             for model in item_models:
                 widget = self.item_model_to_widget(model)
                 self.board_items.append(widget)
 
         # Zooming
-        # Local x and Local y: These values represent the distance between the zoom point and the nearest left and nearest top borders of the cell/image
-        self.lx = 0
-        self.ly = 0
-
-        self.zoom_point = self.ZoomPoint(0, 0)
-        self.last_zoom_point = self.ZoomPoint(0, 0)
-
         self.cell_width = 800
         self.cell_height = 0
 
-        self.zoom_scale = 1
-        self.last_scale = self.zoom_scale
         self.scale_step = 0.1
         self.max_scale = 1.7
         self.min_scale = 0.5
 
-        self.left = 0
-        self.right = 0
-        self.top = 0
-        self.bottom = 0
+        # View: maps world co-ordinates to the screen. Items are projected from their world co-ordinates through it
+        # on demand, which lets off-screen items be skipped entirely
+        self.view = ViewTransform()
 
-        # Anchors/Edges
-        self.top_anchor = -100
-        self.right_anchor = 0
-        self.bottom_anchor = 0
-        self.left_anchor = -100
-        self.adj_x = 0
-        self.adj_y = 0
+        # Edges: the world area (left, top, right, bottom) the view is kept within. Set once the canvas has a size
+        self.board_bounds = None
 
         # Pan
         self.last_x = 0
         self.last_y = 0
-        self.move_x = 0
-        self.move_y = 0
-        self.last_update_time = 0
-        self.update_threshold = 0.016
+        self.panning = False
+
+        # Render scheduling: wheel and pan events only accumulate their deltas, which are applied together at most
+        # once per frame. Item rescaling that does not fit in a frame's time budget is deferred to the next frame
+        self.frame_interval = 16  # ms
+        self.frame_budget = 0.010  # s
+        self.pending_zoom = 0
+        self.pending_zoom_point = (0, 0)
+        self.pending_pan_x = 0
+        self.pending_pan_y = 0
+        self.deferred_items: set[BoardItemView] = set()
+        self._frame_id = None
 
         # Selected tabs
-        self.selected_items: set[BoardItemWidget] = set()
+        self.selected_items: set[BoardItemView] = set()
 
         self.set_bindings()
 
@@ -85,24 +101,42 @@ class BoardCanvas(tk.Canvas):
         self.update_idletasks()
         self.width = self.winfo_width()
         self.height = self.winfo_height()
+        self.board_bounds = (-100, -100, self.width * 2.5, self.height * 2.5)
         self.set_texture()
         self.show_items()
 
-        self.right_anchor = self.width * 2.5
-        self.bottom_anchor = self.height * 2.5
+    @property
+    def zoom_scale(self):
+        return self.view.scale
 
     def add_board_item(self, item: BoardItem):
         item_widget = self.item_model_to_widget(item)
         self.board_items.append(item_widget)
-        item_widget.show()
+        self._filter_item(item_widget)
+        self.update_visible_items()
+
+    def add_board_items(self, items: List[BoardItem]):
+        widgets = [self.item_model_to_widget(item) for item in items]
+        for widget in widgets:
+            self.board_items.append(widget)
+            self._filter_item(widget)
+        self.update_visible_items()
+        self.bind_items(widgets)
+
+    def remove_board_item(self, item_widget: BoardItemView):
+        self.board_items.remove(item_widget)
+        self.item_positions.remove(item_widget)
+        self.shown_items.discard(item_widget)
+        self.selected_items.discard(item_widget)
+        item_widget.destroy()
 
     def item_model_to_widget(self, item: BoardItem):
         if isinstance(item, models.Note):
-            return NoteWidget(self, item)
+            return CanvasNote(self, item) if self.canvas_renderer else NoteWidget(self, item)
         elif isinstance(item, models.Image):
             return ImageWidget(self, item)
         elif isinstance(item, models.Page):
-            return PageWidget(self, item)
+            return CanvasPage(self, item) if self.canvas_renderer else PageWidget(self, item)
         else:
             raise ValueError(
                 f"Cannot convert item '{item} to any sort of BoardItem widget'"
@@ -110,11 +144,25 @@ class BoardCanvas(tk.Canvas):
 
     def set_texture(self):
         self.img = PILImage.open("assets/images/pinboard_background.png")
-        self.photo_image = resize_image(self.img, self.cell_width)
-        self.cell_height = self.photo_image.height()
+        self.cell_height = self.texture(1).height()
+        self.photo_image = self.texture(self.zoom_scale)
 
+        self._resize_tile_pool()
         self._redraw_canvas()
 
+    def texture(self, scale):
+        """
+        Returns the background texture resized for the provided zoom scale, resizing it only on a cache miss
+        """
+        texture = self.textures.get(scale)
+        if texture is None:
+            texture = resize_image(
+                self.img,
+                int(max(self.cell_width * scale, self.cell_height * scale)),
+            )
+            self.textures.put(scale, texture)
+        return texture
+
     def set_bindings(self):
         # Zoom
         self.bind("<MouseWheel>", self.wheel, add=True)
@@ -135,159 +183,240 @@ class BoardCanvas(tk.Canvas):
         self.unbind("<ButtonRelease>")
 
     def wheel(self, event: tk.Event):
-        self.zoom(event.delta / 120, (int(event.x), int(event.y)))
+        # Wheel ticks are accumulated and applied together on the next frame
+        self.pending_zoom += event.delta / 120
+        self.pending_zoom_point = (int(event.x), int(event.y))
+        self.schedule_frame()
+
+    def schedule_frame(self):
+        if self._frame_id is None:
+            self._frame_id = self.after(self.frame_interval, self._render_frame)
+
+    def _render_frame(self):
+        """
+        Applies the pan and zoom accumulated since the last frame in one go. Items are rescaled until the frame's
+        time budget runs out - the rest are only moved into place, and rescaled on the following frames
+        """
+        self._frame_id = None
+        deadline = time.perf_counter() + self.frame_budget
+
+        moved = zoomed = False
+        if self.pending_pan_x or self.pending_pan_y:
+            dx, dy = self.pending_pan_x, self.pending_pan_y
+            self.pending_pan_x = self.pending_pan_y = 0
+            moved = self._move_view(dx, dy)
+        if self.pending_zoom:
+            delta, self.pending_zoom = self.pending_zoom, 0
+            zoomed = self._zoom_view(delta, self.pending_zoom_point)
+
+        if moved or zoomed or self.deferred_items:
+            # Panning moves the items already shown along with the canvas, so only a zoom re-projects them
+            self.update_visible_items(deadline, reproject=zoomed)
+        if self.deferred_items:
+            self.schedule_frame()
 
     def zoom(self, delta, point):
-        self.last_scale = self.zoom_scale
-        self.zoom_scale = round((self.zoom_scale + delta * self.scale_step), 2)
+        if self._zoom_view(delta, point):
+            self.update_visible_items()
 
-        if self.zoom_scale > self.max_scale:
-            self.zoom_scale = self.max_scale
-        elif self.zoom_scale < self.min_scale:
-            self.zoom_scale = self.min_scale
-        else:
-            self.last_zoom_point.x, self.last_zoom_point.y = (
-                self.zoom_point.x,
-                self.zoom_point.y,
-            )
-            self.zoom_point.x, self.zoom_point.y = point
-            self.photo_image = resize_image(
-                self.img,
-                int(
-                    max(
-                        self.cell_width * self.zoom_scale,
-                        self.cell_height * self.zoom_scale,
-                    )
-                ),
-            )
+    def _zoom_view(self, delta, point):
+        # Zooms the view and the background. Returns whether the zoom scale changed
+        scale = round((self.zoom_scale + delta * self.scale_step), 2)
+        scale = min(max(scale, self.min_scale), self.max_scale)
+        if scale == self.zoom_scale:
+            return False
 
-            self._set_boundary_adjustments()
-            self._calculate_borders()
-            self.offset_and_scale_items()
-            self._redraw_canvas()
+        self.view.zoom_at(scale, *point)
+        self._clamp_view()
+        self.photo_image = self.texture(self.zoom_scale)
+
+        self._resize_tile_pool()
+        self._redraw_canvas()
+        return True
 
     def _draw_image(self, x: int, y: int):
-        self.create_image(x, y, image=self.photo_image, tags="tile")
+        return self.create_image(x, y, image=self.photo_image, anchor="nw", tags="tile")
         # _draw_image_test(self, x, y, self.cell_width, self.cell_height, self.zoom_scale,)
 
-    def _set_boundary_adjustments(self):
-        x = self.zoom_point.x
-        y = self.zoom_point.y
-        # Create anchors at all four corners
-        self.top_anchor = y - (y - self.top_anchor) / self.last_scale * self.zoom_scale
-        self.right_anchor = (
-            x - (x - self.right_anchor) / self.last_scale * self.zoom_scale
-        )
-        self.bottom_anchor = (
-            y - (y - self.bottom_anchor) / self.last_scale * self.zoom_scale
-        )
-        self.left_anchor = (
-            x - (x - self.left_anchor) / self.last_scale * self.zoom_scale
-        )
+    def _clamp_view(self):
+        # Keeps the edges of the board outside of the canvas. Returns the translation that was applied
+        if self.board_bounds is None:
+            return 0, 0
+        return self.view.clamp(self.board_bounds, self.width, self.height)
+
+    def visible_world_rect(self):
+        """
+        Returns the (left, top, right, bottom) world co-ordinates of the area currently shown on the canvas
+        """
+        return self.view.rect_to_world(0, 0, self.width, self.height)
+
+    def update_visible_items(self, deadline=None, reproject=True):
+        """
+        Scales and places the items that intersect the visible area and hides the rest. Hidden items are
+        only brought up to date once they scroll back into view.
+        Once the optional deadline (a time.perf_counter value) has passed, items still needing to be rescaled are
+        only placed and are added to deferred_items instead.
+        Without reproject, items that were already shown at the current scale are assumed to be in place
+        """
+        visible = self.item_positions.query_rect(*self.visible_world_rect())
+        if self.tag_filter is not None and self.filter_mode == "hide":
+            visible = {item for item in visible if self._matches_filter(item)}
+        for item in self.shown_items - visible:
+            item.hide()
+
+        # Items already shown at the current scale are in place unless the view was zoomed. The screen positions
+        # of the rest are projected from the item positions together
+        to_place = [
+            item
+            for item in visible
+            if reproject
+            or item.scale_factor != self.zoom_scale
+            or item not in self.shown_items
+        ]
+        xs, ys = self.item_positions.project(self.view, to_place)
+
+        deferred = set()
+        for item, x, y in zip(to_place, xs.tolist(), ys.tolist()):
+            if (
+                deadline is not None
+                and item.scale_factor != self.zoom_scale
+                and time.perf_counter() > deadline
+            ):
+                item.show(x, y)
+                deferred.add(item)
+            else:
+                self._project_item(item, x, y)
+        self.shown_items = visible
+        self.deferred_items = deferred
+
+    def apply_tag_filter(self, item_ids, mode="dim"):
+        """
+        Highlights the items with the provided IDs. Other items are dimmed, or hidden when the mode is "hide"
+        """
+        if mode not in ("dim", "hide"):
+            raise ValueError(f"Invalid filter mode '{mode}'")
+
+        self.tag_filter = set(item_ids)
+        self.filter_mode = mode
+        for item in self.board_items:
+            self._filter_item(item)
+        self.update_visible_items()
 
-        self._adjust_boundaries()
-
-    def _adjust_boundaries(self):
-        self.adj_x = 0
-        self.adj_y = 0
-
-        if self.top_anchor > 0:
-            self.adj_y = -self.top_anchor
-        elif self.bottom_anchor < self.height:
-            self.adj_y = self.height - self.bottom_anchor
-
-        if self.left_anchor > 0:
-            self.adj_x = -self.left_anchor
-        elif self.right_anchor < self.width:
-            self.adj_x = self.width - self.right_anchor
-
-        self.top_anchor += self.adj_y
-        self.right_anchor += self.adj_x
-        self.bottom_anchor += self.adj_y
-        self.left_anchor += self.adj_x
-
-    def _calculate_borders(self):
-        # Calculate Local x (lx) and Local y (ly)
-        x = self.zoom_point.x
-        cw = self.cell_width * self.last_scale
-        dx = x - self.last_zoom_point.x + self.lx
-        x_nearest = self.last_zoom_point.x - self.lx + int(dx / cw) * cw
-        self.lx = (x - x_nearest + cw) % cw / self.last_scale * self.zoom_scale
-
-        y = self.zoom_point.y
-        ch = self.cell_height * self.last_scale
-        dy = y - self.last_zoom_point.y + self.ly
-        y_nearest = self.last_zoom_point.y - self.ly + int(dy / ch) * ch
-        self.ly = (y - y_nearest + ch) % ch / self.last_scale * self.zoom_scale
-
-        # Calculate co-ordinates of borders
-        self.top = int(y - self.ly + self.adj_y)
-        self.left = int(x - self.lx + self.adj_x)
-        self.bottom = int(self.top + ch / self.last_scale * self.zoom_scale)
-        self.right = int(self.left + cw / self.last_scale * self.zoom_scale)
-
-    def offset_and_scale_items(self):
+    def clear_tag_filter(self):
+        self.tag_filter = None
         for item in self.board_items:
-            # change in zoom level
-            dx = item.scaled_x + item.width / 2 - self.zoom_point.x
-            dy = item.scaled_y + item.height / 2 - self.zoom_point.y
-            # Calculate new dx and dy by first rescaling it to default size and then calculating the next dx and dy
-            new_dx = dx / self.last_scale * self.zoom_scale
-            new_dy = dy / self.last_scale * self.zoom_scale
+            self._filter_item(item)
+        self.update_visible_items()
+
+    def _matches_filter(self, item: BoardItemView):
+        return self.tag_filter is None or item.item.item_id in self.tag_filter
+
+    def _filter_item(self, item: BoardItemView):
+        item.dim(self.filter_mode == "dim" and not self._matches_filter(item))
 
-            x = self.zoom_point.x + new_dx
-            y = self.zoom_point.y + new_dy
+    def items_at(self, x, y):
+        """
+        Returns the set of item widgets under the provided point in canvas (screen) co-ordinates
+        """
+        return self.item_positions.query_point(*self.view.to_world(x, y))
 
-            # Scale before using calculating top-left co-ordinates
+    def _project_item(self, item: BoardItemView, x, y):
+        if item.scale_factor != self.zoom_scale:
             item.scale(self.zoom_scale)
-            x = x - item.width / 2 + self.adj_x
-            y = y - item.height / 2 + self.adj_y
-            item.show(x=x, y=y)
-        self.zoom_point.x += self.adj_x
-        self.zoom_point.y += self.adj_y
+        item.show(x, y)
 
     def _redraw_canvas(self):
-        self.delete("tile")
-        scaled_cell_width = int(self.cell_width * self.zoom_scale)
-        scaled_cell_height = int(self.cell_height * self.zoom_scale)
-
-        # Left Side
-        x = self.left
-        while x > 0 - scaled_cell_width:
-            # Top & Bottom
-            y = self.top
-            while y > 0 - scaled_cell_height:
-                self._draw_image(x, y)
-                y -= scaled_cell_height
-            y = self.bottom - 1
-            while y < self.height + scaled_cell_height:
-                self._draw_image(x, y)
-                y += scaled_cell_height
-            x -= scaled_cell_width
-
-        # Right side
-        x = self.right
-        while x < self.width + scaled_cell_width:
-            # Top & Bottom
-            y = self.top
-            while y > 0 - scaled_cell_height:
-                self._draw_image(x, y)
-                y -= scaled_cell_height
-            y = self.bottom - 1
-            while y < self.height + scaled_cell_height:
-                self._draw_image(x, y)
-                y += scaled_cell_height
-            x += scaled_cell_width
+        """
+        Positions the pooled background tiles. When every tile moved by the same amount (the usual case while
+        panning) the whole pool is shifted with a single move, otherwise each tile is repositioned in place
+        """
+        positions = self._tile_positions()
+        if len(positions) > len(self.tiles):
+            self._resize_tile_pool(len(positions))
+
+        if self.tile_image is not self.photo_image:
+            self.itemconfigure("tile", image=self.photo_image)
+            self.tile_image = self.photo_image
+
+        previous = self.tile_positions
+        if positions and len(positions) == len(previous):
+            dx = positions[0][0] - previous[0][0]
+            dy = positions[0][1] - previous[0][1]
+            if all(
+                x == prev_x + dx and y == prev_y + dy
+                for (x, y), (prev_x, prev_y) in zip(positions, previous)
+            ):
+                if dx or dy:
+                    self.move("tile", dx, dy)
+                self.tile_positions = positions
+                return
+
+        for tile, (x, y) in zip(self.tiles, positions):
+            self.coords(tile, x, y)
+
+        # Show the tiles in use and hide the spare ones
+        in_use = len(positions)
+        for tile in self.tiles[in_use : len(previous)]:
+            self.itemconfigure(tile, state="hidden")
+        for tile in self.tiles[len(previous) : in_use]:
+            self.itemconfigure(tile, state="normal")
+        self.tile_positions = positions
+
+    def _tile_positions(self):
+        """
+        The tiles form a grid anchored at the world origin. Returns the top left screen positions of the tiles
+        covering the canvas, always the same number of them for a given canvas size and zoom scale
+        """
+        scaled_cell_width = max(1, int(self.cell_width * self.zoom_scale))
+        scaled_cell_height = max(1, int(self.cell_height * self.zoom_scale))
+
+        first_x = self.view.x % scaled_cell_width - scaled_cell_width
+        first_y = self.view.y % scaled_cell_height - scaled_cell_height
+        columns = ceil(self.width / scaled_cell_width) + 1
+        rows = ceil(self.height / scaled_cell_height) + 1
+
+        return [
+            (first_x + column * scaled_cell_width, first_y + row * scaled_cell_height)
+            for column in range(columns)
+            for row in range(rows)
+        ]
+
+    def _resize_tile_pool(self, minimum=0):
+        """
+        Grows or shrinks the pool of tile canvas items to cover the viewport at the current zoom scale.
+        Only called when the viewport size or zoom scale changes, so panning never creates canvas items
+        """
+        scaled_cell_width = max(1, int(self.cell_width * self.zoom_scale))
+        scaled_cell_height = max(1, int(self.cell_height * self.zoom_scale))
+        columns = ceil(self.width / scaled_cell_width) + 1
+        rows = ceil(self.height / scaled_cell_height) + 1
+        size = max(columns * rows, minimum)
+
+        while len(self.tiles) < size:
+            tile = self._draw_image(0, 0)
+            self.itemconfigure(tile, state="hidden")
+            self.tiles.append(tile)
+        while len(self.tiles) > size:
+            self.delete(self.tiles.pop())
+        # Keep the background below items drawn on the canvas
+        self.tag_lower("tile")
+
+        # Pool changed - hide every tile until the next redraw positions and shows the ones in use
+        self.itemconfigure("tile", state="hidden")
+        self.tile_positions = []
 
     def resize_canvas(self, _event):
         if self.img:
             self.update_idletasks()
             self.width = self.winfo_width()
             self.height = self.winfo_height()
+            self._clamp_view()
+            self._resize_tile_pool()
             self._redraw_canvas()
+            self.update_visible_items()
 
-    def bind_items(self):
-        for item in self.board_items:
+    def bind_items(self, items: List[BoardItemView] = None):
+        for item in self.board_items if items is None else items:
 
             def item_on_click(e, item=item):
                 if not (
@@ -312,16 +441,17 @@ class BoardCanvas(tk.Canvas):
             item.bind(
                 "<ButtonRelease>", lambda event, item=item: item.unbind("<B1-Motion>")
             )
-            children = item.winfo_children()
-            utils.set_bindings("<1>", item_on_click, item, *children)
-            utils.set_bindings("<Shift-1>", item_on_shift_click, item, *children)
+            # Canvas drawn items have no child widgets and bind through their canvas tag
+            for widget in (item, *item.winfo_children()):
+                widget.bind("<1>", item_on_click, add=True)
+                widget.bind("<Shift-1>", item_on_shift_click, add=True)
 
     def unbind_items(self):
         for item in self.board_items:
             item.unbind("<1>")
             item.unbind("<ButtonRelease>")
 
-    def set_drag_binding(self, event: tk.Event, item: BoardItemWidget):
+    def set_drag_binding(self, event: tk.Event, item: BoardItemView):
         item.prev_x = event.x_root
         item.prev_y = event.y_root
         left = self.winfo_rootx()
@@ -348,64 +478,61 @@ class BoardCanvas(tk.Canvas):
             ),
         )
 
+    def event_on_item(self):
+        # Whether the pointer is over a board item drawn on the canvas. Their events also reach the canvas' own
+        # bindings, unlike those of items that are widgets
+        return "item" in self.gettags("current")
+
     def start_pan(self, e: tk.Event):
-        print("start pan")
+        self.panning = not self.event_on_item()
         self.last_x = e.x
         self.last_y = e.y
-        self.last_update_time = time.time()
 
     def pan(self, e: tk.Event):
-        self.move_x = e.x - self.last_x
-        self.move_y = e.y - self.last_y
-        print(f"Move x,y: {self.move_x, self.move_y}")
-        current_time = time.time()
-
-        if current_time - self.last_update_time > self.update_threshold:
-            # Move boundaries
-            self.top_anchor += self.move_y
-            self.right_anchor += self.move_x
-            self.bottom_anchor += self.move_y
-            self.left_anchor += self.move_x
-            self._adjust_boundaries()
-
-            self.move_x += self.adj_x
-            self.move_y += self.adj_y
-
-            if self.move_x != 0 or self.move_y != 0:
-                # Move zoom points
-                self.last_zoom_point.x += self.move_x
-                self.last_zoom_point.y += self.move_y
-                self.zoom_point.x += self.move_x
-                self.zoom_point.y += self.move_y
-                self.top = int(self.zoom_point.y - self.ly)
-                self.left = int(self.zoom_point.x - self.lx)
-                self.bottom = int(self.top + self.cell_height * self.zoom_scale)
-                self.right = int(self.left + self.cell_width * self.zoom_scale)
-
-                # Move canvas objects and widgets
-                for item in self.board_items:
-                    item.pan(self.move_x, self.move_y)
-                self.reset_pan(e)
-                self._redraw_canvas()
-
-            self.last_x = e.x
-            self.last_y = e.y
-            self.last_update_time = current_time
-
-    def reset_pan(self, e: tk.Event):
-        self.move_x = 0
-        self.move_y = 0
+        if not self.panning:
+            # Dragging an item
+            return
+        # Motion is accumulated and applied together on the next frame
+        self.pending_pan_x += e.x - self.last_x
+        self.pending_pan_y += e.y - self.last_y
+        self.last_x = e.x
+        self.last_y = e.y
+        self.schedule_frame()
+
+    def _move_view(self, dx, dy):
+        # Moves the view, the background and every board item. Returns whether the view moved
+        self.view.translate(dx, dy)
+        adjust_x, adjust_y = self._clamp_view()
+        dx += adjust_x
+        dy += adjust_y
+
+        moved = dx != 0 or dy != 0
+        if moved:
+            self.move("item", dx, dy)
+            self.item_shift_x += dx
+            self.item_shift_y += dy
+            self._redraw_canvas()
+        return moved
+
+    def reset_pan(self, e: tk.Event = None):
+        self.panning = False
+
+    def commit_edits(self):
+        # Writes the content of any item being edited back to its model, so it is included in the next save
+        for item in self.board_items:
+            if isinstance(item, CanvasBoardItem):
+                item.stop_editing()
 
     def show_items(self):
         if self.board_items:
-            for item in self.board_items:
-                item.show()
+            self.update_visible_items()
             self.bind_items()
 
     def hide_items(self):
         if self.board_items:
             for item in self.board_items:
                 item.hide()
+            self.shown_items.clear()
             self.unbind_items()
 
     def open(self):
@@ -420,24 +547,9 @@ class BoardCanvas(tk.Canvas):
         self.grid_forget()
 
     def destroy(self):
+        if self._frame_id is not None:
+            self.after_cancel(self._frame_id)
+            self._frame_id = None
         for item in self.board_items:
             item.destroy()
         return super().destroy()
-
-    def _show_lx_ly(self):
-        self.create_line(
-            self.zoom_point.x,
-            self.zoom_point.y,
-            self.zoom_point.x - self.lx,
-            self.zoom_point.y,
-            tags="line",
-            fill=BLUE,
-        )
-        self.create_line(
-            self.zoom_point.x,
-            self.zoom_point.y,
-            self.zoom_point.x,
-            self.zoom_point.y - self.ly,
-            tags="line",
-            fill=BLUE,
-        )
@@ -0,0 +1,63 @@
+from concurrent.futures import Future
+import queue
+import traceback
+
+"""
+The callback_poller file contains the CallbackPoller class, which calls the callbacks of futures finished on other
+threads on the Tk main loop. It is shared by the DatabaseWorker and the ImageResampler.
+"""
+
+
+class CallbackPoller:
+    def __init__(self, root, poll_interval):
+        """
+        Tk objects can only be used from the main loop, so finished futures are queued by the thread that finished
+        them and their callbacks are called when the main loop next polls the queue. It is only polled while
+        futures are outstanding
+        """
+        self.root = root
+        self.poll_interval = poll_interval
+        self._finished = queue.SimpleQueue()
+        self._waiting = 0
+        self._after_id = None
+
+    def watch(self, future: Future, callback):
+        """
+        Calls callback with the future on the main loop once it has finished, unless it was cancelled.
+        Must be called from the main loop
+        """
+        self._waiting += 1
+        future.add_done_callback(lambda f: self._finished.put((f, callback)))
+        if self._after_id is None:
+            self._after_id = self.root.after(self.poll_interval, self._poll)
+
+    def stop(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def call_finished(self):
+        """
+        Calls the callbacks of the futures that have finished so far
+        """
+        while True:
+            try:
+                future, callback = self._finished.get_nowait()
+            except queue.Empty:
+                break
+            self._waiting -= 1
+            if future.cancelled():
+                continue
+            # A failing callback must not stop the callbacks of other futures from running
+            try:
+                callback(future)
+            except Exception:
+                traceback.print_exc()
+
+    def _poll(self):
+        self._after_id = None
+        try:
+            self.call_finished()
+        finally:
+            if self._waiting > 0 and self._after_id is None:
+                self._after_id = self.root.after(self.poll_interval, self._poll)
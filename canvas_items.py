@@ -0,0 +1,231 @@
+import tkinter as tk
+from colours import *
+from models import BoardItem, Note, Page
+from shared_widgets import BoardItemView, DEVICE_SCALE_FACTOR
+
+"""
+The canvas_items file contains lightweight renderers for notes and pages which draw an item directly on the BoardCanvas
+as canvas primitives (a rectangle, a title and a wrapped body text) instead of creating a tree of Tk widgets for it.
+All the primitives of an item share a canvas tag, so the item is moved, shown, hidden and bound as a single unit.
+A real Text widget is only created while the item's content is being edited.
+"""
+
+
+class CanvasBoardItem(BoardItemView):
+    # The item's layout grid, as weights of its rows and columns (the same grid as the equivalent widget uses).
+    # The title sits in row 1 and the body in row 3, both in column 1
+    row_weights = (1, 2, 1, 22, 1)
+    column_weights = (1, 32, 1)
+
+    def __init__(self, canvas: tk.Canvas, width, height, item: BoardItem):
+        self.init_view(canvas, width, height, item)
+
+        tags = (self.tag, "item")
+        self.editor: tk.Text = None
+        self.editor_window = None
+        self.highlighted = False
+
+        self.rectangle = canvas.create_rectangle(
+            0, 0, 0, 0, fill=item.colour, outline=BLACK, width=2, tags=tags
+        )
+        self.title_text = canvas.create_text(
+            0, 0, text=item.title, anchor="nw", fill=BLACK, tags=tags
+        )
+        self.body_text = canvas.create_text(
+            0, 0, text="", anchor="nw", fill=BLACK, tags=tags
+        )
+        canvas.itemconfigure(self.tag, state="hidden")
+        self.layout()
+
+        self.bind("<Double-1>", lambda event: self.start_editing(), add=True)
+
+    def layout(self):
+        """
+        Sizes and positions the item's primitives for the current position and scale
+        """
+        x, y = self.scaled_x, self.scaled_y
+        rows = self._grid_lines(self.row_weights, self.height)
+        columns = self._grid_lines(self.column_weights, self.width)
+
+        self.canvas.coords(self.rectangle, x, y, x + self.width, y + self.height)
+        # Text hidden by the level of detail is laid out once its level is shown again
+        if self.detail == "block":
+            return
+        self.canvas.coords(self.title_text, x + columns[1], y + rows[1])
+        self.canvas.itemconfigure(
+            self.title_text,
+            font=("Commons", self.font_scale + 3, "bold"),
+            width=columns[2] - columns[1],
+        )
+        if self.detail == "card":
+            return
+        self.canvas.coords(self.body_text, x + columns[1], y + rows[3])
+        self.canvas.itemconfigure(
+            self.body_text,
+            font=("Dubai Medium", self.font_scale),
+            width=columns[2] - columns[1],
+        )
+        self._fit_body(y + rows[4])
+
+        if self.editor_window is not None:
+            self.canvas.coords(self.editor_window, x + columns[1], y + rows[3])
+            self.canvas.itemconfigure(
+                self.editor_window,
+                width=columns[2] - columns[1],
+                height=rows[4] - rows[3],
+            )
+
+    def _grid_lines(self, weights, length):
+        # Offsets of the start of each row/column (and of the end of the last one)
+        total = sum(weights)
+        lines = [0]
+        for weight in weights:
+            lines.append(lines[-1] + length * weight / total)
+        return lines
+
+    def _fit_body(self, bottom):
+        # Canvas text is not clipped, so the body is cut to the longest prefix of the content that fits the item.
+        # Hidden items have no bounding box, so the body is measured in the normal state (nothing is drawn until idle)
+        state = self.canvas.itemcget(self.body_text, "state")
+        self.canvas.itemconfigure(self.body_text, state="normal")
+
+        def fits(text):
+            self.canvas.itemconfigure(self.body_text, text=text)
+            bbox = self.canvas.bbox(self.body_text)
+            return bbox is None or bbox[3] <= bottom
+
+        content = self.item.content
+        if not fits(content):
+            low, high = 0, len(content)
+            while low < high:
+                middle = (low + high + 1) // 2
+                if fits(content[:middle] + "…"):
+                    low = middle
+                else:
+                    high = middle - 1
+            fits(content[:low] + "…")
+
+        self.canvas.itemconfigure(self.body_text, state=state)
+
+    def scale(self, factor=1.0):
+        self.scale_factor = factor
+        self.width = self.original_width * factor
+        self.height = self.original_height * factor
+
+        self.update_detail()
+        self.scale_content()
+        self.layout()
+
+    def set_detail(self, detail):
+        super().set_detail(detail)
+        if detail != "full" and self.editor is not None:
+            self.stop_editing()
+        self.update_state()
+
+    def update_state(self):
+        # Shows the primitives needed for the item's level of detail while it is visible
+        state = "normal" if self.visible else "hidden"
+        self.canvas.itemconfigure(self.rectangle, state=state)
+        self.canvas.itemconfigure(
+            self.title_text, state=state if self.detail != "block" else "hidden"
+        )
+        self.canvas.itemconfigure(
+            self.body_text,
+            state=state if self.detail == "full" and self.editor is None else "hidden",
+        )
+        if self.editor_window is not None:
+            self.canvas.itemconfigure(self.editor_window, state=state)
+
+    def hide(self):
+        if self.editor is not None:
+            self.stop_editing()
+        super().hide()
+
+    def highlight(self):
+        self.highlighted = True
+        self.canvas.itemconfigure(self.rectangle, outline=HIGHLIGHT_COLOUR, width=3)
+
+    def remove_highlight(self):
+        self.highlighted = False
+        self.canvas.itemconfigure(self.rectangle, outline=BLACK, width=2)
+
+    def paint(self, colour):
+        self.canvas.itemconfigure(self.rectangle, fill=colour)
+        if self.editor is not None:
+            self.editor.configure(bg=colour)
+
+    def lift(self):
+        self.canvas.tag_raise(self.tag)
+
+    # Bindings are made on the item's canvas tag, so they apply to all of its primitives
+
+    def bind(self, sequence=None, func=None, add=None):
+        return self.canvas.tag_bind(self.tag, sequence, func, add)
+
+    def unbind(self, sequence, funcid=None):
+        self.canvas.tag_unbind(self.tag, sequence, funcid)
+
+    def winfo_children(self):
+        return []
+
+    def start_editing(self):
+        """
+        Swaps the body text for a Text widget so the content can be edited. The changes are written back to the
+        item when editing stops (on focus out or Escape)
+        """
+        if self.editor is not None or self.detail != "full":
+            return
+
+        self.editor = tk.Text(
+            self.canvas,
+            bg=self.display_colour(),
+            relief=tk.FLAT,
+            wrap="word",
+            font=("Dubai Medium", self.font_scale),
+        )
+        self.editor.insert("1.0", self.item.content)
+        self.editor_window = self.canvas.create_window(
+            0, 0, window=self.editor, anchor="nw", tags=(self.tag, "item")
+        )
+        self.canvas.itemconfigure(self.body_text, state="hidden")
+        self.layout()
+
+        self.editor.bind("<FocusOut>", lambda event: self.stop_editing())
+        self.editor.bind("<Escape>", lambda event: self.stop_editing())
+        self.editor.focus_set()
+
+    def stop_editing(self):
+        if self.editor is None:
+            return
+
+        # Cleared before the editor is destroyed, as destroying it triggers another FocusOut
+        editor, self.editor = self.editor, None
+        self.item.content = editor.get("1.0", "end-1c")
+        self.canvas.delete(self.editor_window)
+        self.editor_window = None
+        editor.destroy()
+
+        self.update_state()
+        self.layout()
+
+    def destroy(self):
+        # Content being edited is kept
+        self.stop_editing()
+        self.canvas.delete(self.tag)
+
+
+class CanvasNote(CanvasBoardItem):
+    def __init__(self, canvas, item: Note):
+        width = 280 * DEVICE_SCALE_FACTOR
+        height = 280 * DEVICE_SCALE_FACTOR
+        super().__init__(canvas, width, height, item)
+
+
+class CanvasPage(CanvasBoardItem):
+    row_weights = (1, 2, 1, 28, 1)
+    column_weights = (1, 18, 1)
+
+    def __init__(self, canvas, item: Page):
+        width = 280 * DEVICE_SCALE_FACTOR
+        height = 400 * DEVICE_SCALE_FACTOR
+        super().__init__(canvas, width, height, item)
@@ -1,6 +1,6 @@
-import asyncio
 import re
-from database_service import DatabaseService
+from concurrent.futures import Future
+from database_service import DatabaseService, DatabaseWorker
 from datetime import date
 import customtkinter as ctk
 from board_canvas import BoardCanvas
@@ -21,6 +21,7 @@ class BoardHandler:
     _open_canvases: Dict[int, BoardCanvas] = {}
     _canvas_parent = None
     _all_boards_ids = []
+    _filter_tags: Dict[int, set] = {}
 
     """
         The BoardHandler (BH) is a singleton class responsible for managing boards, including the items stored within a board.
@@ -33,6 +34,7 @@ class BoardHandler:
         self._canvas_parent = canvas_parent
         self.side_panel: MainSidePanelFrame = side_panel
         self.db_service: DatabaseService = Services.get("DatabaseService")
+        self.db_worker: DatabaseWorker = Services.get("DatabaseWorker")
 
     def initialize_boards(self):
         # Create sublist for boards that are OPEN
@@ -92,17 +94,57 @@ class BoardHandler:
     def open_board(self, id: int):
         """
         Retrieves board with provided ID from database and adds it to list of open boards. Also creates a corresponding BoardCanvas
+        If the board's items have not been loaded yet, they are loaded on the database worker and added to the canvas once ready
         """
         if not id in self._open_boards:
-            board: Board = self.db_service.get_board(id)
+            board: Board = self.db_service.get_board_header(id)
             if board:
                 self._open_boards[id] = board
                 self._open_canvases[id] = BoardCanvas(
-                    self._canvas_parent, self.side_panel, board.board_items
+                    self._canvas_parent, self.side_panel, board.board_items or []
                 )
+                if not board.loaded:
+                    self.db_worker.submit(
+                        "get_items",
+                        id,
+                        callback=lambda future: self._items_loaded(board, future),
+                    )
             else:
                 raise ValueError(f"Board with id '{id} does not exist'")
 
+    def _items_loaded(self, board: Board, future: Future):
+        if board.loaded:
+            # Loaded by an earlier request while this one was queued
+            return
+        try:
+            items = future.result()
+        except Exception as e:
+            print(e)
+            # The board is closed again, so opening it retries the load
+            tab_handler: TabHandler = Services.get("TabHandler")
+            tab = tab_handler.find_tab_by_id(board.id)
+            if tab is not None:
+                tab_handler._finalize_close(tab)
+            if board.id in self._open_boards:
+                self.close_board(board.id)
+            if not tab_handler._tab_list.tabs:
+                tab_handler.add_new_tab()
+            messagebox.showerror(
+                "Database Error",
+                f"The items of board '{board.name}' failed to load, so it was closed. Please try opening it again.",
+            )
+            return
+        board.set_items(items)
+        if board.id in self._open_canvases:
+            self._open_canvases[board.id].add_board_items(items)
+
+    def commit_edits(self):
+        """
+        Writes the content of items being edited on any open board back to their models
+        """
+        for canvas in self._open_canvases.values():
+            canvas.commit_edits()
+
     def close_board(self, board_id=-1, next_board_id=-1):
         """
         Removes board from of open boards and destroys corresponding canvas
@@ -117,6 +159,7 @@ class BoardHandler:
                     f"No current board set - Please specify a board id for the board to close."
                 )
         try:
+            self._filter_tags.pop(board_id, None)
             self._open_boards.pop(board_id)
             self._open_canvases[board_id].destroy()
             self._open_canvases.pop(board_id)
@@ -125,22 +168,84 @@ class BoardHandler:
         if next_board_id != -1:
             self.show_board(next_board_id)
 
-    def save_board(self, board_id, name=""):
+    def save_board(self, board_id, name="", callback=None) -> Future:
+        """
+        Saves the board's name and any unsaved item changes on the database worker.
+        Returns a future, and calls the optional callback with it on the main loop once the board is saved
+        """
         if board_id in self._open_boards.keys():
             board = self._open_boards[board_id]
             if name != "":
                 board.name = name
 
-            # TODO: Update board and all it's items in database
+            if board_id in self._open_canvases:
+                self._open_canvases[board_id].commit_edits()
+            Services.get("ItemWriteQueue").flush()
             board.saved = True
-            return True
+            return self.db_worker.submit(
+                "update_board_name", board.id, board.name, callback=callback
+            )
         else:
             raise ValueError(f"No open board with ID {board_id} exists.")
 
+    def filter_by_tags(self, tags, match_all=True, mode="dim", board_id=-1):
+        """
+        Highlights the items of a board carrying the provided tags, dimming or hiding the rest. The matching
+        items are looked up on the database worker. An empty set of tags clears the filter
+        """
+        if board_id == -1:
+            board_id = self._current_board.id
+        if board_id not in self._open_canvases:
+            raise ValueError(f"No open board with ID {board_id} exists.")
+
+        tags = set(tags)
+        self._filter_tags[board_id] = tags
+        if not tags:
+            self._open_canvases[board_id].clear_tag_filter()
+            return
+
+        def apply_filter(future: Future):
+            # Ignore results for a filter that has since been replaced or cleared
+            if board_id not in self._open_canvases or self._filter_tags.get(board_id) != tags:
+                return
+            try:
+                items_by_board = future.result()
+            except Exception as e:
+                # The board is left unfiltered
+                print(e)
+                self._filter_tags.pop(board_id, None)
+                self._open_canvases[board_id].clear_tag_filter()
+                messagebox.showerror("Database Error", "The tag filter could not be applied.")
+                return
+            self._open_canvases[board_id].apply_tag_filter(
+                items_by_board.get(board_id, set()), mode
+            )
+
+        self.db_worker.submit(
+            "get_items_by_tags",
+            tags,
+            match_all,
+            board_id,
+            callback=apply_filter,
+        )
+
+    def toggle_tag_filter(self, tag, board_id=-1):
+        """
+        Adds the tag to the current board's filter, or removes it if it is already part of it
+        """
+        if board_id == -1:
+            board_id = self._current_board.id
+        tags = set(self._filter_tags.get(board_id, ()))
+        tags ^= {tag}
+        self.filter_by_tags(tags, board_id=board_id)
+
     def current_canvas(self):
         return self._open_canvases[self._current_board.id]
 
     def set_side_panel_context(self, event=None):
+        if event is not None and self.current_canvas().event_on_item():
+            # The click selected an item drawn on the canvas
+            return
         self.side_panel.set_context(self.side_panel.Contexts.BOARD, self._current_board)
 
 class TabHandler:
@@ -394,16 +499,16 @@ class TabHandler:
             self.close_after_rename = close_after
 
         def process_rename(self, th: "TabHandler" = None, event=None):
-            async def save_board(th_):
+            def save_board(th_):
                 if th == None:
                     raise ValueError(
                         "TabHandler instance must be provided when renaming a board before closing"
                     )
                 if self.close_after_rename:
-                    await th_.save_and_close_tab(self)
+                    th_.save_and_close_tab(self)
                     self.close_after_rename = False
                 else:
-                    await th_.save_tab(self)
+                    th_.save_tab(self)
 
             if not self.entry.winfo_exists():
                 return
@@ -434,7 +539,7 @@ class TabHandler:
 
             self.end_rename()
 
-            asyncio.run(save_board(th))
+            save_board(th)
 
         def end_rename(self, event=None):
             self.entry.grid_forget()
@@ -658,13 +763,15 @@ class TabHandler:
         else:
             self._finalize_close(tab)
 
-    async def save_and_close_tab(self, tab):
-        task = await self.save_tab(tab)
-        if task == True:
-            self._finalize_close(tab)
+    def save_and_close_tab(self, tab):
+        def close_if_saved(future: Future):
+            if future.exception() is None:
+                self._finalize_close(tab)
+
+        self.save_tab(tab, callback=close_if_saved)
 
-    def save_tab(self, tab: "TabHandler.Tab"):
-        return asyncio.to_thread(self._bh.save_board, tab.board_id, tab.title)
+    def save_tab(self, tab: "TabHandler.Tab", callback=None):
+        return self._bh.save_board(tab.board_id, tab.title, callback)
 
     def _finalize_close(self, tab):
         tabs = self._tab_list.tabs
@@ -707,6 +814,18 @@ class TabHandler:
     def remove_highlight(self, tab: "Tab"):
         tab.config(bg=PRIMARY_COLOUR)
 
+    def show_board(self, board_id):
+        """
+        Swaps to the tab of the board with the provided ID, opening a new tab for it if necessary
+        """
+        tab = self.find_tab_by_id(board_id)
+        if tab is None:
+            board = self._bh.db_service.get_board_header(board_id)
+            if board is None or not self.open_tab(board):
+                return
+            tab = self.find_tab_by_id(board_id)
+        self.swap_tabs(tab)
+
     def find_tab_by_id(self, board_id):
         return next(
             (tab for tab in self._tab_list.tabs if tab.board_id == board_id), None
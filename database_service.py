@@ -1,10 +1,21 @@
+from concurrent.futures import Future
+from contextlib import contextmanager
 from datetime import datetime
 from enum import Enum
+from itertools import combinations
 import os
+import json
+import queue
+import re
+import threading
 from typing import List
+from callback_poller import CallbackPoller
+from image_store import ImageStore
+from migrations import migrate
 from utilities import get_setting
 import models
 import sqlite3
+from tkinter import messagebox
 import models
 
 
@@ -21,114 +32,488 @@ class QueryTypes(Enum):
     SCRIPT = "executescript"
 
 
+def _update_item_statements(columns: dict):
+    # One UPDATE per combination of changed board_item fields, keyed by the sorted tuple of the fields' names
+    statements = {}
+    for count in range(1, len(columns) + 1):
+        for fields in combinations(sorted(columns), count):
+            assignments = ", ".join(f"{columns[field]} = ?" for field in fields)
+            statements[fields] = f"UPDATE board_item SET {assignments} WHERE id = ?;"
+    return statements
+
+
+class Statements:
+    """
+    Registry of the named SQL statements run by the DatabaseService. Every statement is a fixed string - lists of
+    IDs or tags are passed as a single JSON array parameter and expanded with json_each - so each statement is
+    compiled once per connection and then reused from sqlite3's statement cache
+    """
+
+    SELECT_CATALOGUE = """
+        SELECT b.id, b.name, b.date_created, COUNT(bi.id)
+        FROM board b
+        LEFT JOIN board_item bi ON bi.board_id = b.id
+        GROUP BY b.id;
+    """
+    INSERT_BOARD = "INSERT INTO board (name, date_created) VALUES (?, ?);"
+    UPDATE_BOARD_NAME = "UPDATE board SET name = ? WHERE id = ?;"
+    DELETE_BOARD = "DELETE FROM board WHERE id = ?;"
+
+    # Items of every type in one query: (board_id, type, id, title, date_created, content, x, y, colour).
+    # The content of an image is the hash of its file in the ImageStore
+    _SELECT_ITEMS = """
+        SELECT bi.board_id, bi.type, bi.id, bi.title, bi.date_created,
+               COALESCE(n.content, p.content, f.hash), bi.x_pos, bi.y_pos, bi.colour
+        FROM board_item bi
+        LEFT JOIN note n ON bi.type = 'note' AND n.id = bi.id
+        LEFT JOIN page p ON bi.type = 'page' AND p.id = bi.id
+        LEFT JOIN image_file f ON bi.type = 'image' AND f.id = bi.id
+        {where}
+        ORDER BY CASE bi.type WHEN 'note' THEN 0 WHEN 'page' THEN 1 ELSE 2 END, bi.id;
+    """
+    SELECT_ALL_ITEMS = _SELECT_ITEMS.format(where="")
+    SELECT_BOARD_ITEMS = _SELECT_ITEMS.format(
+        where="WHERE bi.board_id IN (SELECT value FROM json_each(?))"
+    )
+    SELECT_ITEM = _SELECT_ITEMS.format(where="WHERE bi.id = ?")
+    INSERT_ITEM = """
+        INSERT INTO board_item (title, board_id, colour, date_created, type, x_pos, y_pos)
+        VALUES (?, ?, ?, ?, ?, ?, ?);
+    """
+    INSERT_CONTENT = {
+        "note": "INSERT INTO note (id, content) VALUES (?, ?);",
+        "page": "INSERT INTO page (id, content) VALUES (?, ?);",
+        "image": "INSERT INTO image_file (id, hash) VALUES (?, ?);",
+    }
+    # Persisted BoardItem attributes mapped to their board_item columns
+    ITEM_COLUMNS = {"title": "title", "colour": "colour", "x": "x_pos", "y": "y_pos"}
+    UPDATE_ITEM = _update_item_statements(ITEM_COLUMNS)
+    UPDATE_CONTENT = {
+        "note": "UPDATE note SET content = ? WHERE id = ?;",
+        "page": "UPDATE page SET content = ? WHERE id = ?;",
+    }
+
+    SELECT_ALL_TAGS = "SELECT item_id, text FROM tag;"
+    SELECT_BOARD_TAGS = """
+        SELECT t.item_id, t.text
+        FROM tag t
+        JOIN board_item bi ON bi.id = t.item_id
+        WHERE bi.board_id IN (SELECT value FROM json_each(?));
+    """
+    SELECT_ITEM_TAGS = "SELECT item_id, text FROM tag WHERE item_id = ?;"
+    SELECT_LEGACY_IMAGE_IDS = "SELECT id FROM image;"
+    SELECT_LEGACY_IMAGE = "SELECT image FROM image WHERE id = ?;"
+    DELETE_LEGACY_IMAGE = "DELETE FROM image WHERE id = ?;"
+    SELECT_IMAGE_HASHES = "SELECT DISTINCT hash FROM image_file;"
+
+    INSERT_TAG = "INSERT INTO tag (item_id, text) VALUES (?, ?);"
+    DELETE_TAG = "DELETE FROM tag WHERE item_id = ? AND text = ?;"
+    # Parameters: tags (JSON array), board ID (or NULL) twice, match all, number of tags
+    SELECT_ITEMS_BY_TAGS = """
+        SELECT bi.board_id, t.item_id
+        FROM tag t
+        JOIN board_item bi ON bi.id = t.item_id
+        WHERE t.text IN (SELECT value FROM json_each(?)) AND (? IS NULL OR bi.board_id = ?)
+        GROUP BY t.item_id
+        HAVING NOT ? OR COUNT(DISTINCT t.text) = ?;
+    """
+
+    SEARCH_ITEMS = """
+        SELECT s.board_id, s.rowid, bi.type, bi.title,
+               snippet(item_search, -1, '[', ']', '...', 10),
+               bm25(item_search, 10.0, 1.0, 5.0) AS score
+        FROM item_search s
+        JOIN board_item bi ON bi.id = s.rowid
+        WHERE item_search MATCH ?
+        ORDER BY score
+        LIMIT ? OFFSET ?;
+    """
+
+
+# Row factories - map rows straight into models objects as they are fetched
+
+
+def board_from_row(cursor, row):
+    return models.Board(row[0], row[1], row[2], item_count=row[3])
+
+
+def search_result_from_row(cursor, row):
+    return models.SearchResult(*row)
+
+
+def item_from_row_with(tags_by_item: dict):
+    """
+    Returns a row factory mapping item rows to (board ID, item) pairs, with each item's tags looked up in tags_by_item
+    """
+    item_classes = DatabaseService.ITEM_CLASSES
+
+    def item_from_row(cursor, row):
+        board_id, type, item_id, *fields = row
+        return board_id, item_classes[type](item_id, *fields, tags_by_item.get(item_id, ()))
+
+    return item_from_row
+
+
+class ItemWriteQueue:
+    """
+    Write-behind queue for board item changes. Changed items are collected in a set and written together
+    when the queue is flushed, either a short while after the first change (once the app is idle) or on close.
+    Repeated changes to the same item, such as while dragging it, are therefore coalesced into a single write.
+    Failed writes are retried with an increasing delay, up to MAX_ATTEMPTS times
+    """
+
+    MAX_ATTEMPTS = 4
+
+    def __init__(
+        self,
+        db_service: "DatabaseService",
+        root,
+        worker: "DatabaseWorker" = None,
+        interval=2000,
+    ):
+        self.db_service = db_service
+        self.root = root
+        self.worker = worker
+        self.interval = interval
+        self.dirty: set = set()
+        # Items whose changes could not be written after MAX_ATTEMPTS. They are written again with their next change
+        self.failed: set = set()
+        self._attempts: dict = {}
+        self._closing = False
+        self._after_id = None
+
+    def add(self, item: models.BoardItem):
+        self.failed.discard(item)
+        self.dirty.add(item)
+        self._schedule(self.interval)
+
+    def _schedule(self, delay):
+        if self._after_id is None:
+            self._after_id = self.root.after(delay, self._flush_when_idle)
+
+    def _flush_when_idle(self):
+        self._after_id = self.root.after_idle(self.flush)
+
+    def flush(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+        if self.dirty:
+            items, self.dirty = self.dirty, set()
+            # Kept until the write has succeeded, so the changes can be queued again if it fails
+            dirty_fields = {item: set(item.dirty_fields) for item in items}
+            # Changes are read from the models on the main thread and only the writes are handed to the worker
+            changes = self.db_service.collect_item_changes(items)
+            if self.worker:
+                self.worker.submit(
+                    "write_item_changes",
+                    *changes,
+                    callback=lambda future: self._written(future, dirty_fields),
+                )
+            else:
+                try:
+                    self.db_service.write_item_changes(*changes)
+                except Exception as e:
+                    self._write_failed(dirty_fields, e)
+                else:
+                    self._write_succeeded(dirty_fields)
+
+    def close(self):
+        """
+        Writes the remaining changes, including ones that failed before, on the calling thread - called once the
+        worker has stopped. Returns whether every change was saved
+        """
+        self._closing = True
+        self.worker = None
+        self.dirty |= self.failed
+        self.failed.clear()
+        self.flush()
+        return not self.dirty and not self.failed
+
+    def _written(self, future: Future, dirty_fields: dict):
+        if future.exception() is not None:
+            self._write_failed(dirty_fields, future.exception())
+        else:
+            self._write_succeeded(dirty_fields)
+
+    def _write_succeeded(self, dirty_fields: dict):
+        for item in dirty_fields:
+            self._attempts.pop(item, None)
+
+    def _write_failed(self, dirty_fields: dict, error: Exception):
+        # Marks the fields as changed again (keeping any made since)
+        print(f"Failed to save item changes: {error}")
+        for item, fields in dirty_fields.items():
+            item.dirty_fields |= fields
+        if self._closing:
+            # Reported by close's caller
+            self.dirty |= dirty_fields.keys()
+            return
+
+        given_up = set()
+        for item in dirty_fields:
+            attempts = self._attempts.get(item, 0) + 1
+            if attempts < self.MAX_ATTEMPTS:
+                self._attempts[item] = attempts
+                self.dirty.add(item)
+            else:
+                self._attempts.pop(item, None)
+                given_up.add(item)
+        if self.dirty:
+            # Retried with a delay that doubles with every failed attempt
+            attempts = max(self._attempts.get(item, 1) for item in self.dirty)
+            self._schedule(self.interval * 2**attempts)
+        if given_up:
+            self.failed |= given_up
+            messagebox.showerror(
+                "Database Error",
+                f"Changes to {len(given_up)} item(s) could not be saved ({error}). "
+                "They will be saved again the next time the items are changed or the app is closed.",
+            )
+
+
+class DatabaseWorker:
+    """
+    Runs DatabaseService methods on a dedicated thread that owns its own sqlite3 connection, so slow queries
+    never block the Tk main loop. submit returns a concurrent.futures.Future, and the optional callback is
+    called with that future on the main loop once it has finished
+    """
+
+    def __init__(self, db_name, root, poll_interval=20):
+        self.root = root
+        self.poll_interval = poll_interval
+        self.db_service: DatabaseService = None
+
+        self._requests = queue.Queue()
+        self._callbacks = CallbackPoller(root, poll_interval)
+        self._running: Future = None
+        self._running_lock = threading.Lock()
+        self._thread = threading.Thread(
+            target=self._run, args=(db_name,), name="DatabaseWorker", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, method: str, *args, callback=None, **kwargs) -> Future:
+        future = Future()
+        if callback:
+            self._callbacks.watch(future, callback)
+        self._requests.put((future, method, args, kwargs))
+        return future
+
+    def cancel(self, future: Future):
+        """
+        Cancels a submitted call. A call that is already running is interrupted, making it raise sqlite3.OperationalError
+        """
+        if future.cancel():
+            return
+        with self._running_lock:
+            if self._running is future:
+                self.db_service.conn.interrupt()
+
+    def stop(self, timeout=5):
+        """
+        Finishes all submitted calls and closes the worker's connection
+        """
+        self._requests.put(None)
+        self._thread.join(timeout)
+        self._callbacks.stop()
+        # Callbacks of the last calls (such as the final flush of the ItemWriteQueue) still get their result
+        self._callbacks.call_finished()
+
+    def _run(self, db_name):
+        # The connection must be created on the thread that uses it
+        self.db_service = DatabaseService(db_name)
+
+        while True:
+            request = self._requests.get()
+            if request is None:
+                break
+
+            future, method, args, kwargs = request
+            if not future.set_running_or_notify_cancel():
+                continue
+            with self._running_lock:
+                self._running = future
+            try:
+                future.set_result(getattr(self.db_service, method)(*args, **kwargs))
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                with self._running_lock:
+                    self._running = None
+
+        self.db_service.close()
+
+
 class DatabaseService:
 
     conn: sqlite3.Connection = None
+    db_name: str = None
+    image_store: ImageStore = None
 
     # cache
-    _boards: List[models.Board] = []
+    _boards: List[models.Board]
+
+    # Connection profile applied to every connection as PRAGMAs, in this order. Any of them can be overridden with the
+    # DATABASE_CONNECTION setting. WAL lets the worker thread read while the main thread writes, and with
+    # synchronous = NORMAL commits no longer wait for an fsync (only checkpoints do)
+    CONNECTION_PROFILE = {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "cache_size": -32000,  # negative -> KiB, so ~32MB of page cache
+        "mmap_size": 268435456,
+        "temp_store": "MEMORY",
+    }
+
+    # Item types stored in board_item.type and the models they are loaded as
+    ITEM_CLASSES = {"note": models.Note, "page": models.Page, "image": models.Image}
+    ITEM_TYPES = {item_class: type for type, item_class in ITEM_CLASSES.items()}
+
+    # Persisted BoardItem attributes mapped to their board_item columns
+    ITEM_COLUMNS = Statements.ITEM_COLUMNS
 
     def __init__(self, db_name=None):
+        # Each instance (one per thread) keeps its own cache
+        self._boards = []
+        # Number of transaction() blocks currently entered
+        self._transaction_depth = 0
         if db_name:
             self.set_connection(db_name=db_name)
 
     def set_connection(self, db_name):
-        self.conn = sqlite3.connect(f"{db_name}.db")
+        self.db_name = db_name
+        # Autocommit mode - transactions are only opened explicitly through transaction()
+        self.conn = sqlite3.connect(f"{db_name}.db", isolation_level=None)
         self.conn.execute("PRAGMA foreign_keys = ON;")
+        self.apply_connection_profile()
+        self.image_store = ImageStore(f"{db_name}_images")
+
+    def apply_connection_profile(self):
+        profile = {**self.CONNECTION_PROFILE, **get_setting("DATABASE_CONNECTION", {})}
+        for pragma, value in profile.items():
+            if pragma not in self.CONNECTION_PROFILE:
+                raise ValueError(f"Unsupported connection setting '{pragma}'")
+            if not re.fullmatch(r"-?\w+", str(value)):
+                raise ValueError(f"Invalid value '{value}' for connection setting '{pragma}'")
+            self.conn.execute(f"PRAGMA {pragma} = {value};")
+
+    @contextmanager
+    def transaction(self):
+        """
+        Groups the writes made inside the with-block into a single transaction that is committed when the outermost
+        block exits, or rolled back if it raises. Nested blocks use savepoints, so an exception caught inside an
+        outer block only undoes the writes of the inner block
+        """
+        depth = self._transaction_depth
+        savepoint = f"sp_{depth}"
+        self.conn.execute("BEGIN;" if depth == 0 else f"SAVEPOINT {savepoint};")
+        self._transaction_depth += 1
+        try:
+            yield self.conn
+            # Committed inside the try, so a failed commit (such as a deferred constraint or SQLITE_BUSY) is rolled
+            # back too instead of leaving the connection inside the transaction
+            self.conn.execute("COMMIT;" if depth == 0 else f"RELEASE {savepoint};")
+        except BaseException:
+            # Some errors already roll the whole transaction back
+            if self.conn.in_transaction:
+                if depth == 0:
+                    self.conn.execute("ROLLBACK;")
+                else:
+                    self.conn.execute(f"ROLLBACK TO {savepoint};")
+                    self.conn.execute(f"RELEASE {savepoint};")
+            raise
+        finally:
+            self._transaction_depth -= 1
+
+    def close(self):
+        """
+        Lets SQLite refresh the statistics of tables whose usage warrants it, then closes the connection
+        """
+        if self.conn is not None:
+            self.conn.execute("PRAGMA optimize;")
+            self.conn.close()
+            self.conn = None
 
     def create_tables(self):
-        c = self.conn.cursor()
-
-        c.executescript(
-            """
-            CREATE TABLE IF NOT EXISTS board (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                date_created TEXT NOT NULL
-            );
-            
-            CREATE TABLE IF NOT EXISTS board_item (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT,
-                board_id INT NOT NULL,
-                colour TEXT NOT NULL,
-                date_created TEXT NOT NULL,
-                type TEXT CHECK(type IN ('note', 'page', 'image')),
-                x_pos INTEGER NOT NULL,
-                y_pos INTEGER NOT NULL,
-                
-                CHECK(length(colour) = 7)
-                FOREIGN KEY (board_id) REFERENCES board(id) ON DELETE CASCADE
-            );
-            
-            CREATE TABLE IF NOT EXISTS tag (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                item_id INTEGER NOT NULL,
-                text TEXT NOT NULL,
-                
-                FOREIGN KEY (item_id) REFERENCES board_item(id) ON DELETE CASCADE
-            );
-            
-            CREATE TABLE IF NOT EXISTS note (
-                id INTEGER PRIMARY KEY,
-                content TEXT NOT NULL,
-                
-                FOREIGN KEY (id) REFERENCES board_item(id) ON DELETE CASCADE
-            );
-            
-            CREATE TABLE IF NOT EXISTS page (
-                id INTEGER PRIMARY KEY,
-                content TEXT NOT NULL,
-                
-                FOREIGN KEY (id) REFERENCES board_item(id) ON DELETE CASCADE
-            );
-            
-            CREATE TABLE IF NOT EXISTS image (
-                id INTEGER PRIMARY KEY,
-                image BLOB NOT NULL,
-                
-                FOREIGN KEY (id) REFERENCES board_item(id) ON DELETE CASCADE
-            );
         """
-        )
+        Creates the database schema, or brings an existing database up to the latest schema version
+        """
+        migrate(self.conn)
+        self.import_legacy_images()
 
-        self.conn.commit()
+    def import_legacy_images(self):
+        """
+        Moves images stored as BLOBs in the image table (before the ImageStore existed) into the ImageStore
+        """
+        for (id,) in self._query(Statements.SELECT_LEGACY_IMAGE_IDS):
+            # One image at a time so only a single BLOB is held in memory
+            (image_bytes,) = self._query(Statements.SELECT_LEGACY_IMAGE, data=(id,))[0]
+            digest = self.image_store.put(image_bytes)
+            with self.transaction():
+                self._execute(Statements.INSERT_CONTENT["image"], data=(id, digest))
+                self._execute(Statements.DELETE_LEGACY_IMAGE, data=(id,))
+
+    def collect_image_garbage(self):
+        """
+        Deletes the files in the ImageStore that no image item references any more, such as those of deleted items
+        and boards. Must be called before images are added, so a file is never deleted before its item is saved.
+        Returns the number of images deleted
+        """
+        referenced = {digest for (digest,) in self._query(Statements.SELECT_IMAGE_HASHES)}
+        unreferenced = self.image_store.digests() - referenced
+        for digest in unreferenced:
+            self.image_store.delete(digest)
+        return len(unreferenced)
 
     def get_all_board_ids(self):
-        if self._boards:
-            return [board.id for board in self._boards]
-        return self._query("SELECT id FROM board;")
+        return [board.id for board in self.get_catalogue()]
 
-    def get_boards(self):
+    def get_catalogue(self):
         """
-        Returns a list of boards each including its items
+        Returns a list of lightweight boards (id, name, date created and item count) without their items.
+        Items are only loaded once a board is requested with get_board or get_boards
         """
         if not self._boards:
-            result = self._query("SELECT id, name, date_created FROM board;")
-            for record in result:
-                items = self.get_items(record[0])
-                board = models.Board(record[0], record[1], record[2], items)
-                self._boards.append(board)
+            self._boards = self._query(
+                Statements.SELECT_CATALOGUE, row_factory=board_from_row
+            )
         return self._boards
 
+    def get_boards(self):
+        """
+        Returns a list of boards each including its items
+        """
+        boards = self.get_catalogue()
+        unloaded = [board for board in boards if not board.loaded]
+        if unloaded:
+            items = self.load_items(board.id for board in unloaded)
+            for board in unloaded:
+                board.set_items(items.get(board.id, []))
+        return boards
+
     def get_board(self, id: int):
-        if not self._boards:
-            record = next(
-                iter(self._query("SELECT * FROM board WHERE id=?;", data=(id,))), None
-            )
-            if record:
-                items = self.get_items(record[0])
-                return models.Board(record[0], record[1], record[2], items)
-            return None
+        """
+        Returns the board with the provided ID, loading its items on first access
+        """
+        board = self.get_board_header(id)
+        if board and not board.loaded:
+            board.set_items(self.get_items(board.id))
+        return board
 
-        return next(iter(board for board in self._boards if board.id == id), None)
+    def get_board_header(self, id: int):
+        """
+        Returns the catalogue entry for the board with the provided ID without loading its items
+        """
+        return next(iter(board for board in self.get_catalogue() if board.id == id), None)
 
     def get_open_boards(self):
         open_ids = get_setting("OPEN_TABS")
 
-        boards = self.get_boards()
+        boards = self.get_catalogue()
         if boards:
-            return [board for board in boards if board.id not in open_ids] or None
+            return [board for board in boards if board.id in open_ids] or None
         return None
 
     def create_board(self, board: models.Board):
@@ -137,37 +522,117 @@ class DatabaseService:
         Note: Modifies board object's ID attribute with ID stored generated by SQLite
         """
 
-        cursor = self._execute(
-            "INSERT INTO board (name, date_created) VALUES (?, ?);",
-            data=(
-                board.name,
-                board.date_created,
-            ),
-        )
-        board.id = cursor.lastrowid
-        self._boards.append(board)
+        boards = self.get_catalogue()
+        with self.transaction():
+            cursor = self._execute(
+                Statements.INSERT_BOARD,
+                data=(
+                    board.name,
+                    board.date_created,
+                ),
+            )
+            board.id = cursor.lastrowid
+            if board.loaded:
+                self.create_items(board.id, board.board_items)
+            else:
+                board.set_items([])
+        boards.append(board)
+
+    def create_items(self, board_id, items):
+        """
+        Inserts the provided items (with their contents and tags) into the board with the provided ID in a single
+        transaction. Note: Modifies each item's item_id attribute with the ID generated by SQLite
+        """
+        with self.transaction():
+            for item in items:
+                item_type = self.ITEM_TYPES[type(item)]
+                cursor = self._execute(
+                    Statements.INSERT_ITEM,
+                    data=(
+                        item.title,
+                        board_id,
+                        item.colour,
+                        item.date_created,
+                        item_type,
+                        round(item.x),
+                        round(item.y),
+                    ),
+                )
+                item_id = cursor.lastrowid
+
+                if item_type == "image":
+                    content = item.image_hash or self.image_store.put(item.image_bytes)
+                else:
+                    content = item.content
+                self._execute(
+                    Statements.INSERT_CONTENT[item_type], data=(item_id, content)
+                )
+                if item.tags:
+                    self._execute(
+                        Statements.INSERT_TAG,
+                        QueryTypes.MANY,
+                        data=[(item_id, text) for text in item.tags],
+                    )
+
+                item.item_id = item_id
+                if item_type == "image" and item.image_hash is None:
+                    # The image is read from the store from now on
+                    item.set_hash(content)
+                item.dirty_fields.clear()
 
     def save_board_items(self, board: models.Board):
         if not board.saved:
             # board contains unsaved items
-            changes = []
-            for item in board.board_items:
-                if item.changed:
-                    changes.append(
-                        (item.title, item.colour, item.x_pos, item.y_pos, item.id)
-                    )
-                    item.changed = False
+            self.save_items([item for item in board.board_items if item.changed])
 
-            if changes:
-                self._execute(
-                    sql="UPDATE board_item SET title = ?, colour = ?, x_pos= ?, y_pos= ? WHERE id =?;",
-                    type=QueryTypes.MANY,
-                    data=changes,
-                )
+    def save_items(self, items):
+        """
+        Writes the changed fields of the provided items in a single transaction
+        """
+        self.write_item_changes(*self.collect_item_changes(items))
+
+    def collect_item_changes(self, items):
+        """
+        Returns the changed fields of the provided items as rows grouped by the fields that changed, and marks the
+        items as saved. Items sharing the same set of changed fields can then be written together with executemany
+        """
+        item_updates = {}
+        content_updates = {}
+        for item in items:
+            if item.item_id is None or not item.dirty_fields:
+                # Items that have not been inserted yet are written when they are created
+                continue
+
+            fields = tuple(sorted(item.dirty_fields & self.ITEM_COLUMNS.keys()))
+            if fields:
+                row = [
+                    round(getattr(item, field)) if field in ("x", "y") else getattr(item, field)
+                    for field in fields
+                ]
+                item_updates.setdefault(fields, []).append((*row, item.item_id))
+
+            if "content" in item.dirty_fields:
+                item_type = self.ITEM_TYPES[type(item)]
+                content_updates.setdefault(item_type, []).append((item.content, item.item_id))
+
+            item.dirty_fields.clear()
+
+        return item_updates, content_updates
+
+    def write_item_changes(self, item_updates: dict, content_updates: dict):
+        if not item_updates and not content_updates:
+            return
+
+        with self.transaction():
+            c = self.conn.cursor()
+            for fields, rows in item_updates.items():
+                c.executemany(Statements.UPDATE_ITEM[fields], rows)
+            for item_type, rows in content_updates.items():
+                c.executemany(Statements.UPDATE_CONTENT[item_type], rows)
 
     def update_board_name(self, id, name):
         self._execute(
-            "UPDATE board SET name=? WHERE id=?",
+            Statements.UPDATE_BOARD_NAME,
             data=(
                 name,
                 id,
@@ -180,97 +645,113 @@ class DatabaseService:
         """
         for board in self._boards:
             if board.id == id:
-                self._execute("DELETE * FROM board WHERE id=?", data=(id,))
+                self._execute(Statements.DELETE_BOARD, data=(id,))
                 self._boards.remove(board)
                 return
         raise ValueError(f"No board with id '{id}' exists")
 
     def get_item(self, id):
-        result = next(
-            (
-                self._query(
-                    "SELECT id, title, colour, date_created, x_pos, y_pos FROM board_item WHERE id=?",
-                    data=(id,),
-                )
-            ),
-            None,
+        """
+        Returns the item with the provided ID, or None if it does not exist
+        """
+        tags_by_item = self._tags_by_item(Statements.SELECT_ITEM_TAGS, (id,))
+        records = self._query(
+            Statements.SELECT_ITEM,
+            data=(id,),
+            row_factory=item_from_row_with(tags_by_item),
         )
-
-        if result:
-            tags = [
-                tag[0]
-                for tag in self._query(
-                    "SELECT text FROM tag WHERE item_id=?", data=(result[0],)
-                )
-            ]
-            return models.BoardItem(
-                result[0],
-                result[1],
-                result[2],
-                tags,
-                result[3],
-                result[4],
-                result[5],
-            )
-
-        return None
+        return records[0][1] if records else None
 
     def get_items(self, board_id):
-        notes = self._query(
-            """
-            SELECT bi.id, bi.title, bi.date_created, n.content, bi.x_pos, bi.y_pos, bi.colour
-            FROM board_item bi
-            LEFT JOIN note n ON bi.id = n.id
-            WHERE board_id=? AND bi.type = 'note';
-            """,
-            data=(board_id,),
-        )
-        pages = self._query(
-            """
-            SELECT bi.id, bi.title, bi.date_created, p.content, bi.x_pos, bi.y_pos, bi.colour
-            FROM board_item bi
-            LEFT JOIN page p ON bi.id = p.id
-            WHERE board_id=? AND bi.type = 'page';
-            """,
-            data=(board_id,),
-        )
-        images = self._query(
-            """
-            SELECT bi.id, bi.title, bi.date_created, i.image, bi.x_pos, bi.y_pos, bi.colour
-            FROM board_item bi
-            LEFT JOIN image i ON bi.id = i.id
-            WHERE bi.board_id = ? AND bi.type = 'image'
-            """,
-            data=(board_id,),
-        )
-        all_tags = self._query(
-            "SELECT i.id, t.text FROM board_item i JOIN tag t ON i.id = t.item_id WHERE i.board_id=?",
-            data=(board_id,),
+        return self.load_items([board_id]).get(board_id, [])
+
+    def load_items(self, board_ids=None):
+        """
+        Bulk loads the items of the boards with the provided IDs (or of every board when no IDs are given).
+        Returns a dictionary mapping each board ID to its list of items
+        """
+        if board_ids is None:
+            items_sql, tags_sql, data = Statements.SELECT_ALL_ITEMS, Statements.SELECT_ALL_TAGS, ()
+        else:
+            board_ids = list(board_ids)
+            if not board_ids:
+                return {}
+            items_sql, tags_sql = Statements.SELECT_BOARD_ITEMS, Statements.SELECT_BOARD_TAGS
+            data = (json.dumps(board_ids),)
+
+        tags_by_item = self._tags_by_item(tags_sql, data)
+        records = self._query(
+            items_sql, data=data, row_factory=item_from_row_with(tags_by_item)
         )
 
-        class_map = {
-            "Note": models.Note,
-            "Page": models.Page,
-            "Image": models.Image,
-        }
+        items = {board_id: [] for board_id in board_ids or ()}
+        for board_id, item in records:
+            items.setdefault(board_id, []).append(item)
+
+        return items
+
+    def _tags_by_item(self, sql, data):
+        # Group tags by item ID so each item can look up its own tags directly
+        tags_by_item = {}
+        for item_id, text in self._query(sql, data=data):
+            tags_by_item.setdefault(item_id, []).append(text)
+        return tags_by_item
 
-        def tuple_to_item(item, type):
-            tags = [tag[1] for tag in all_tags if tag[0] == item[0]]
-            return class_map.get(type)(*item, tags)
+    def add_tag(self, item_id, text):
+        self._execute(Statements.INSERT_TAG, data=(item_id, text))
 
-        items = []
+    def remove_tag(self, item_id, text):
+        self._execute(Statements.DELETE_TAG, data=(item_id, text))
 
-        for note in notes:
-            items.append(tuple_to_item(note, "Note"))
-        for page in pages:
-            items.append(tuple_to_item(page, "Page"))
-        for image in images:
-            items.append(tuple_to_item(image, "Image"))
+    def get_items_by_tags(self, tags, match_all=True, board_id=None):
+        """
+        Returns a dictionary mapping board IDs to the set of IDs of their items carrying the provided tags.
+        With match_all, items must carry every tag (AND), otherwise any one of them (OR).
+        Optionally limited to the board with the provided ID
+        """
+        tags = list(set(tags))
+        if not tags:
+            return {}
 
+        records = self._query(
+            Statements.SELECT_ITEMS_BY_TAGS,
+            data=(json.dumps(tags), board_id, board_id, match_all, len(tags)),
+        )
+
+        items = {}
+        for board, item_id in records:
+            items.setdefault(board, set()).add(item_id)
         return items
 
-    def _query(self, sql: str, type: QueryTypes = QueryTypes.SINGLE, data=None):
+    def search(self, query: str, limit=20, offset=0):
+        """
+        Searches the titles, contents and tags of the items on every board.
+        Returns a list of SearchResults ordered from best to worst match (title matches rank highest, then tags)
+        """
+        match = self._match_expression(query)
+        if not match:
+            return []
+
+        return self._query(
+            Statements.SEARCH_ITEMS,
+            data=(match, limit, offset),
+            row_factory=search_result_from_row,
+        )
+
+    def _match_expression(self, query: str):
+        # Quote every word of the query so FTS5 syntax characters are matched literally. Each word is
+        # matched as a prefix so results appear while the last word is still being typed
+        words = re.findall(r"\w+", query)
+        return " ".join(f'"{word}"*' for word in words)
+
+    def _query(
+        self, sql: str, type: QueryTypes = QueryTypes.SINGLE, data=None, row_factory=None
+    ):
+        """
+        Runs a query and returns its rows, mapped through the optional row factory (see sqlite3.Cursor.row_factory)
+        """
         c = self.conn.cursor()
+        c.row_factory = row_factory
 
         if type == QueryTypes.SINGLE:
             c.execute(sql, data or ())
@@ -286,18 +767,25 @@ class DatabaseService:
         return c.fetchall()
 
     def _execute(self, sql: str, type: QueryTypes = QueryTypes.SINGLE, data=None):
-        c = self.conn.cursor()
-
-        if type == QueryTypes.SINGLE:
-            c.execute(sql, data or ())
-        elif type == QueryTypes.MANY:
-            c.executemany(sql, data)
-        elif type == QueryTypes.SCRIPT:
-            c.executescript(sql)
-        else:
-            raise ValueError(
-                f"Query type '{type}' not recognized. Use QueryTypes enum to see relevant types"
-            )
+        """
+        Runs a write statement as part of the current transaction, or in its own transaction outside of one
+        """
+        if type == QueryTypes.SCRIPT:
+            # executescript manages its own transactions
+            if self._transaction_depth:
+                raise ValueError("Scripts cannot be executed inside a transaction")
+            return self.conn.executescript(sql)
+
+        with self.transaction():
+            c = self.conn.cursor()
+
+            if type == QueryTypes.SINGLE:
+                c.execute(sql, data or ())
+            elif type == QueryTypes.MANY:
+                c.executemany(sql, data)
+            else:
+                raise ValueError(
+                    f"Query type '{type}' not recognized. Use QueryTypes enum to see relevant types"
+                )
 
-        self.conn.commit()
         return c
@@ -0,0 +1,35 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from callback_poller import CallbackPoller
+
+"""
+The image_resampler file contains the ImageResampler class, which decodes and resamples images away from the Tk
+main loop so zooming a board full of images never blocks input handling.
+"""
+
+
+class ImageResampler:
+    def __init__(self, root, workers=2, poll_interval=15):
+        """
+        Jobs run on a small thread pool - PIL releases the GIL while decoding and resampling, so they run in parallel
+        with the main loop. Callbacks are called on the Tk main loop once their job has finished, as Tk objects
+        (such as photo images) can only be created there
+        """
+        self.root = root
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="ImageResampler"
+        )
+        self._callbacks = CallbackPoller(root, poll_interval)
+
+    def submit(self, function, *args, callback=None) -> Future:
+        """
+        Runs function(*args) on the pool and returns a future. The optional callback is called with the future on
+        the main loop once it has finished, unless it was cancelled
+        """
+        future = self._executor.submit(function, *args)
+        if callback:
+            self._callbacks.watch(future, callback)
+        return future
+
+    def stop(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._callbacks.stop()
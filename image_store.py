@@ -0,0 +1,117 @@
+import hashlib
+import mmap
+import os
+import threading
+from io import BytesIO
+from PIL import Image
+
+"""
+The image_store file contains the ImageStore class, a content-addressed store for the image files of board items.
+Images are saved once per distinct content under the SHA-256 hash of their bytes, so identical images added to
+several boards share one file. The database only keeps each image item's hash.
+"""
+
+
+class ImageStore:
+    # Longest side, in pixels, of the thumbnails generated for every image when it is added
+    THUMBNAIL_SIZES = (256, 1024)
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def put(self, image_bytes: bytes) -> str:
+        """
+        Stores the image (unless an identical one is already stored) along with its thumbnails. Returns its hash
+        """
+        digest = hashlib.sha256(image_bytes).hexdigest()
+
+        missing = [
+            size for size in self.THUMBNAIL_SIZES if not os.path.exists(self.path(digest, size))
+        ]
+        if missing:
+            # Raises for data that is not an image before anything is written
+            with Image.open(BytesIO(image_bytes)) as image:
+                for size in missing:
+                    self._write(self.path(digest, size), self._thumbnail(image, size))
+
+        if not os.path.exists(self.path(digest)):
+            self._write(self.path(digest), image_bytes)
+
+        return digest
+
+    def path(self, digest: str, size=None):
+        # Files are spread over sub-directories named after the first two characters of their hash
+        name = digest if size is None else f"{digest}_{size}.png"
+        return os.path.join(self.directory, digest[:2], name)
+
+    def open(self, digest: str, size=None) -> mmap.mmap:
+        """
+        Returns a read-only memory map of the image (or of its thumbnail with the provided size). Pages are only
+        read from disk as they are accessed, and the memory is shared with the OS file cache
+        """
+        with open(self.path(digest, size), "rb") as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def read_image(self, digest: str, size=None) -> Image.Image:
+        """
+        Returns the decoded image (or its thumbnail with the provided size)
+        """
+        with self.open(digest, size) as data:
+            image = Image.open(data)
+            image.load()
+        return image
+
+    def thumbnail_size(self, size):
+        """
+        Returns the smallest thumbnail size covering the provided size, or None if only the original image does
+        """
+        return next((s for s in self.THUMBNAIL_SIZES if s >= size), None)
+
+    def digests(self) -> set:
+        """
+        Returns the hashes of every stored image, including those of which only some files are left
+        """
+        digests = set()
+        for entry in os.scandir(self.directory):
+            if entry.is_dir():
+                for file in os.scandir(entry.path):
+                    if not file.name.endswith(".tmp"):
+                        digests.add(file.name.split("_")[0])
+        return digests
+
+    def delete(self, digest: str):
+        """
+        Deletes the image and its thumbnails, along with its sub-directory once it is empty
+        """
+        for size in (None, *self.THUMBNAIL_SIZES):
+            try:
+                os.remove(self.path(digest, size))
+            except FileNotFoundError:
+                pass
+        try:
+            os.rmdir(os.path.dirname(self.path(digest)))
+        except OSError:
+            # The sub-directory still holds other images
+            pass
+
+    def __contains__(self, digest):
+        return os.path.exists(self.path(digest))
+
+    def _thumbnail(self, image: Image.Image, size):
+        thumbnail = image.copy()
+        if thumbnail.mode not in ("RGB", "RGBA", "L", "LA", "P"):
+            thumbnail = thumbnail.convert("RGBA")
+        thumbnail.thumbnail((size, size), Image.LANCZOS)
+
+        output = BytesIO()
+        thumbnail.save(output, format="PNG")
+        return output.getvalue()
+
+    def _write(self, path, data: bytes):
+        # Written to a temporary file first so a partially written file is never visible under its final name
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary_path, "wb") as f:
+            f.write(data)
+        os.replace(temporary_path, path)
@@ -0,0 +1,126 @@
+import numpy as np
+from spatial_index import SpatialGrid
+
+"""
+The item_positions file contains the ItemPositions class, the store of the world positions and sizes of the items on
+a board. The values are kept in one NumPy array per attribute (a structure of arrays), so projecting many items for a
+change of view is a handful of vectorised operations instead of a loop over widgets. A SpatialGrid over the same
+rectangles answers area and point queries.
+"""
+
+
+class ItemPositions:
+    def __init__(self, capacity=64):
+        """
+        Each item (the key) owns a row of the arrays: the world co-ordinates of its top left corner and its unscaled
+        width and height. Removed rows are filled with the last row, so rows stay packed and the arrays only grow
+        when they are full. This is the only copy of these values - item widgets read theirs from here
+        """
+        self.keys = []
+        self._rows: dict = {}
+        self.index = SpatialGrid()
+
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.width = np.zeros(capacity)
+        self.height = np.zeros(capacity)
+
+    def insert(self, key, x, y, width, height):
+        if key in self._rows:
+            raise ValueError(f"'{key}' is already in the item positions")
+
+        row = len(self.keys)
+        if row == len(self.x):
+            self._grow()
+        self.keys.append(key)
+        self._rows[key] = row
+        self.x[row] = x
+        self.y[row] = y
+        self.width[row] = width
+        self.height[row] = height
+        self.index.insert(key, *self.bounds(key))
+
+    def remove(self, key):
+        if key not in self._rows:
+            raise ValueError(f"'{key}' is not in the item positions")
+
+        row = self._rows.pop(key)
+        last = len(self.keys) - 1
+        last_key = self.keys.pop()
+        if row != last:
+            for column in self._columns():
+                column[row] = column[last]
+            self.keys[row] = last_key
+            self._rows[last_key] = row
+        self.index.remove(key)
+
+    def position(self, key):
+        # The world co-ordinates of the item's top left corner
+        row = self._rows[key]
+        return float(self.x[row]), float(self.y[row])
+
+    def size(self, key):
+        # The item's unscaled width and height
+        row = self._rows[key]
+        return float(self.width[row]), float(self.height[row])
+
+    def bounds(self, key):
+        # The item's (left, top, right, bottom) world co-ordinates
+        row = self._rows[key]
+        x, y = float(self.x[row]), float(self.y[row])
+        return x, y, x + float(self.width[row]), y + float(self.height[row])
+
+    def move(self, key, dx, dy):
+        row = self._rows[key]
+        self.x[row] += dx
+        self.y[row] += dy
+        self.index.update(key, *self.bounds(key))
+
+    def resize(self, key, width, height):
+        row = self._rows[key]
+        self.width[row] = width
+        self.height[row] = height
+        self.index.update(key, *self.bounds(key))
+
+    def query_rect(self, left, top, right, bottom):
+        """
+        Returns the set of keys whose rectangles intersect the provided rectangle
+        """
+        return self.index.query_rect(left, top, right, bottom)
+
+    def query_point(self, x, y):
+        """
+        Returns the set of keys whose rectangles contain the provided point
+        """
+        return self.index.query_point(x, y)
+
+    def project(self, view, keys=None):
+        """
+        Returns arrays of the screen co-ordinates of the top left corners of the provided items (or of every item)
+        through the provided ViewTransform, in the same order
+        """
+        if keys is None:
+            rows = slice(0, len(self.keys))
+        else:
+            rows = np.fromiter(
+                (self._rows[key] for key in keys), dtype=np.intp, count=len(keys)
+            )
+        return (
+            self.x[rows] * view.scale + view.x,
+            self.y[rows] * view.scale + view.y,
+        )
+
+    def _columns(self):
+        return (self.x, self.y, self.width, self.height)
+
+    def _grow(self):
+        size = len(self.x) * 2
+        self.x, self.y, self.width, self.height = (
+            np.resize(column, size) for column in self._columns()
+        )
+
+    def __contains__(self, key):
+        return key in self._rows
+
+    def __len__(self):
+        return len(self.keys)
@@ -14,7 +14,8 @@ from colours import *
 from window_manager import WindowManager
 from PIL import Image, ImageTk
 from service_locator import Services
-from database_service import DatabaseService
+from database_service import DatabaseService, DatabaseWorker, ItemWriteQueue
+from image_resampler import ImageResampler
 
 
 class App(tk.Tk):
@@ -39,6 +40,7 @@ class App(tk.Tk):
         try:
             database_service.create_tables()
             _reset_db(database_service.conn)
+            database_service.collect_image_garbage()
         except sqlite3.OperationalError as e:
             print(e)
             messagebox.showerror(
@@ -47,6 +49,17 @@ class App(tk.Tk):
             )
             self.wm.close()
         Services.register("DatabaseService", database_service)
+        Services.register("ImageStore", database_service.image_store)
+
+        # Image Resampler - decodes and scales images off the main loop
+        Services.register("ImageResampler", ImageResampler(self))
+
+        # Database Worker - runs slow database calls off the main loop
+        database_worker = DatabaseWorker(database_service.db_name, self)
+        Services.register("DatabaseWorker", database_worker)
+        Services.register(
+            "ItemWriteQueue", ItemWriteQueue(database_service, self, database_worker)
+        )
 
         # Title bar
         self.logo = None
@@ -66,6 +79,7 @@ class App(tk.Tk):
         # Tab Handler and Board Handler
         bh = BoardHandler(board_area, side_panel)
         th = TabHandler(self, bh)
+        Services.register("BoardHandler", bh)
         Services.register("TabHandler", th)
         th.create_tab_list_on(parent=tabs_and_board)
 
@@ -75,6 +89,16 @@ class App(tk.Tk):
 
     def save_and_close(self):
         # perform logic such as saving unsaved boards
+        Services.get("BoardHandler").commit_edits()
+        # Writes still queued on the worker finish first, then the remaining changes are written here
+        Services.get("DatabaseWorker").stop()
+        if not Services.get("ItemWriteQueue").close():
+            messagebox.showwarning(
+                "Unsaved Changes",
+                "Some changes to board items could not be saved and will be lost.",
+            )
+        Services.get("ImageResampler").stop()
+        Services.get("DatabaseService").close()
         self.wm.close()
 
     def custom_title_bar(self, window: tk.Tk):
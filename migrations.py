@@ -0,0 +1,183 @@
+import sqlite3
+
+"""
+The migrations file contains the versioned schema of the pinboard database. The database's schema version is stored
+in 'PRAGMA user_version' and every migration after that version is applied in order when the database is opened.
+To change the schema, append a new migration to MIGRATIONS - never edit one that has already been released,
+otherwise existing databases will not receive the change.
+"""
+
+
+MIGRATIONS = [
+    # 1: Base tables. IF NOT EXISTS lets databases created before versioning was introduced adopt version 1
+    """
+    CREATE TABLE IF NOT EXISTS board (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        date_created TEXT NOT NULL
+    );
+
+    CREATE TABLE IF NOT EXISTS board_item (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT,
+        board_id INT NOT NULL,
+        colour TEXT NOT NULL,
+        date_created TEXT NOT NULL,
+        type TEXT CHECK(type IN ('note', 'page', 'image')),
+        x_pos INTEGER NOT NULL,
+        y_pos INTEGER NOT NULL,
+
+        CHECK(length(colour) = 7)
+        FOREIGN KEY (board_id) REFERENCES board(id) ON DELETE CASCADE
+    );
+
+    CREATE TABLE IF NOT EXISTS tag (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        item_id INTEGER NOT NULL,
+        text TEXT NOT NULL,
+
+        FOREIGN KEY (item_id) REFERENCES board_item(id) ON DELETE CASCADE
+    );
+
+    CREATE TABLE IF NOT EXISTS note (
+        id INTEGER PRIMARY KEY,
+        content TEXT NOT NULL,
+
+        FOREIGN KEY (id) REFERENCES board_item(id) ON DELETE CASCADE
+    );
+
+    CREATE TABLE IF NOT EXISTS page (
+        id INTEGER PRIMARY KEY,
+        content TEXT NOT NULL,
+
+        FOREIGN KEY (id) REFERENCES board_item(id) ON DELETE CASCADE
+    );
+
+    CREATE TABLE IF NOT EXISTS image (
+        id INTEGER PRIMARY KEY,
+        image BLOB NOT NULL,
+
+        FOREIGN KEY (id) REFERENCES board_item(id) ON DELETE CASCADE
+    );
+    """,
+    # 2: Secondary indexes for the hot queries. Loading a board (and counting its items in the catalogue) seeks on
+    # board_item(board_id, type), and the tags of an item, or the items carrying a tag, are read from covering indexes.
+    # tag_item_text also backs the tag -> board_item foreign key, so deleting items no longer scans the tag table
+    """
+    CREATE INDEX IF NOT EXISTS board_item_board_type ON board_item (board_id, type);
+    CREATE INDEX IF NOT EXISTS tag_item_text ON tag (item_id, text);
+    CREATE INDEX IF NOT EXISTS tag_text_item ON tag (text, item_id);
+    """,
+    # 3: Full-text search index over item titles, note and page contents, and tags. Each row's rowid is the board
+    # item's ID, and triggers keep the index in sync with the source tables
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS item_search USING fts5(
+        title,
+        content,
+        tags,
+        board_id UNINDEXED,
+        prefix = '2 3'
+    );
+
+    CREATE TRIGGER IF NOT EXISTS board_item_search_insert AFTER INSERT ON board_item BEGIN
+        INSERT INTO item_search (rowid, title, content, tags, board_id)
+        VALUES (new.id, COALESCE(new.title, ''), '', '', new.board_id);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS board_item_search_update AFTER UPDATE OF title, board_id ON board_item BEGIN
+        UPDATE item_search SET title = COALESCE(new.title, ''), board_id = new.board_id
+        WHERE rowid = new.id;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS board_item_search_delete AFTER DELETE ON board_item BEGIN
+        DELETE FROM item_search WHERE rowid = old.id;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS note_search_insert AFTER INSERT ON note BEGIN
+        UPDATE item_search SET content = new.content WHERE rowid = new.id;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS note_search_update AFTER UPDATE OF content ON note BEGIN
+        UPDATE item_search SET content = new.content WHERE rowid = new.id;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS page_search_insert AFTER INSERT ON page BEGIN
+        UPDATE item_search SET content = new.content WHERE rowid = new.id;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS page_search_update AFTER UPDATE OF content ON page BEGIN
+        UPDATE item_search SET content = new.content WHERE rowid = new.id;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS tag_search_insert AFTER INSERT ON tag BEGIN
+        UPDATE item_search
+        SET tags = (SELECT group_concat(text, ' ') FROM tag WHERE item_id = new.item_id)
+        WHERE rowid = new.item_id;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS tag_search_update AFTER UPDATE ON tag BEGIN
+        UPDATE item_search
+        SET tags = COALESCE((SELECT group_concat(text, ' ') FROM tag WHERE item_id = old.item_id), '')
+        WHERE rowid = old.item_id;
+        UPDATE item_search
+        SET tags = (SELECT group_concat(text, ' ') FROM tag WHERE item_id = new.item_id)
+        WHERE rowid = new.item_id;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS tag_search_delete AFTER DELETE ON tag BEGIN
+        UPDATE item_search
+        SET tags = COALESCE((SELECT group_concat(text, ' ') FROM tag WHERE item_id = old.item_id), '')
+        WHERE rowid = old.item_id;
+    END;
+
+    -- (Re)build the index from the items already stored
+    DELETE FROM item_search;
+    INSERT INTO item_search (rowid, title, content, tags, board_id)
+    SELECT bi.id, COALESCE(bi.title, ''), COALESCE(n.content, p.content, ''),
+           COALESCE((SELECT group_concat(t.text, ' ') FROM tag t WHERE t.item_id = bi.id), ''),
+           bi.board_id
+    FROM board_item bi
+    LEFT JOIN note n ON n.id = bi.id
+    LEFT JOIN page p ON p.id = bi.id;
+    """,
+    # 4: Image items reference a file in the ImageStore by its hash instead of holding the image as a BLOB.
+    # The BLOBs of existing images are moved into the store by DatabaseService.import_legacy_images
+    """
+    CREATE TABLE IF NOT EXISTS image_file (
+        id INTEGER PRIMARY KEY,
+        hash TEXT NOT NULL,
+
+        FOREIGN KEY (id) REFERENCES board_item(id) ON DELETE CASCADE
+    );
+
+    CREATE INDEX IF NOT EXISTS image_file_hash ON image_file (hash);
+    """,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def get_schema_version(conn: sqlite3.Connection):
+    return conn.execute("PRAGMA user_version;").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection):
+    """
+    Applies every migration newer than the database's schema version. Each migration runs in its own transaction
+    together with the version bump, so a failed migration leaves the database at the previous version
+    """
+    version = get_schema_version(conn)
+    if version > SCHEMA_VERSION:
+        raise sqlite3.DatabaseError(
+            f"Database schema version {version} is newer than the supported version {SCHEMA_VERSION}"
+        )
+
+    for number, script in enumerate(MIGRATIONS[version:], start=version + 1):
+        try:
+            conn.executescript(
+                f"BEGIN;\n{script}\nPRAGMA user_version = {number};\nCOMMIT;"
+            )
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
@@ -1,17 +1,42 @@
 from abc import abstractmethod
-from utilities import bytes_to_image, get_display_size, random_colour
+from itertools import count
+from typing import Union
+from utilities import (
+    LRUCache,
+    bytes_to_image,
+    fit_size,
+    get_display_size,
+    get_setting,
+    image_size_in_bytes,
+    random_colour,
+)
 from colours import *
+from service_locator import Services
 
 class Board():
-    def __init__(self, id, name, date_created, board_items: list):
+    def __init__(self, id, name, date_created, board_items: list = None, item_count=None):
         self.id = id
         self.name = name
         self.date_created = date_created
+        # board_items is None until the board's items have been loaded from the database
         self.board_items = board_items
+        self.item_count = len(board_items) if board_items is not None else item_count or 0
         
         self.saved = True
+
+    @property
+    def loaded(self):
+        return self.board_items is not None
+
+    def set_items(self, board_items: list):
+        self.board_items = board_items
+        self.item_count = len(board_items)
         
 class BoardItem():
+    # Attributes stored in the database. Changing one of them after the item is created records it in
+    # dirty_fields and queues the item to be written by the "ItemWriteQueue" service
+    tracked_fields = {"title", "colour", "x", "y"}
+
     def __init__(self, item_id, title, colour, tags, date_created, x, y):
         self.item_id = item_id
         self.title = title
@@ -21,24 +46,148 @@ class BoardItem():
         self.x = x
         self.y = y
         
-        self.changed = False
+        # Assigned last so the assignments above are not tracked as changes
+        self.dirty_fields: set[str] = set()
+
+    def __setattr__(self, name, value):
+        tracking = name in self.tracked_fields and "dirty_fields" in self.__dict__
+        if tracking and self.__dict__.get(name) == value:
+            return
+
+        super().__setattr__(name, value)
+
+        if tracking:
+            self.dirty_fields.add(name)
+            queue = Services.get("ItemWriteQueue")
+            if queue:
+                queue.add(self)
+
+    @property
+    def changed(self):
+        return bool(self.dirty_fields)
         
 class Note(BoardItem):
+    tracked_fields = BoardItem.tracked_fields | {"content"}
+
     def __init__(self, item_id, title, date_created, content, x, y, colour=None, tags = []):
         colour = colour or random_colour()
-        super().__init__(item_id, title, colour, tags, date_created, x, y)
-        
         self.content = content
+
+        super().__init__(item_id, title, colour, tags, date_created, x, y)
         
 class Page(BoardItem):
+    tracked_fields = BoardItem.tracked_fields | {"content"}
+
     def __init__(self, item_id, title, date_created, content, x, y, colour=WHITE, tags = []):
-        super().__init__(item_id, title, colour, tags, date_created, x, y)
-        
         self.content = content
+
+        super().__init__(item_id, title, colour, tags, date_created, x, y)
         
 class Image(BoardItem):
-    def __init__(self, item_id, title, date_created, image_bytes: bytes, x, y, colour=WHITE, tags = []):
+    # Decoded images and thumbnails of all boards share one cache so only recently rendered images stay in memory
+    decoded_images = LRUCache(
+        get_setting("DECODED_IMAGE_CACHE_MB", 256) * 1024 * 1024,
+        sizeof=image_size_in_bytes,
+    )
+    # Ids for the cache keys of images that have not been saved yet. Unlike id(), they are never reused
+    _unsaved_ids = count()
+
+    def __init__(self, item_id, title, date_created, image: Union[bytes, str], x, y, colour=WHITE, tags = []):
         super().__init__(item_id, title, colour, tags, date_created, x, y)
         
-        self.image = bytes_to_image(image_bytes)
+        # Stored images are loaded with the hash of their file in the "ImageStore" service and are read from it when
+        # rendered. New images keep their encoded bytes until they are saved
+        if isinstance(image, str):
+            self.image_hash = image
+            self.image_bytes = None
+        else:
+            self.image_hash = None
+            self.image_bytes = image
+        self._unsaved_key = f"unsaved:{next(Image._unsaved_ids)}"
+
+    @property
+    def cache_key(self):
+        return self.image_hash or self._unsaved_key
+
+    def set_hash(self, image_hash):
+        """
+        Records that the image was saved to the "ImageStore" under the provided hash. Its images cached under the
+        temporary key of the unsaved image are dropped, as it is cached under its hash from now on
+        """
+        old_key = self.cache_key
+        self.image_hash = image_hash
+        self.image_bytes = None
+        Image.decoded_images.pop_matching(
+            lambda key: key == old_key or (isinstance(key, tuple) and key[0] == old_key)
+        )
+
+    @property
+    def image(self):
+        """
+        The full resolution image
+        """
+        key = self.cache_key
+        image = Image.decoded_images.get(key)
+        if image is None:
+            if self.image_hash is not None:
+                image = Services.get("ImageStore").read_image(self.image_hash)
+            else:
+                image = bytes_to_image(self.image_bytes)
+                image.load()
+            Image.decoded_images.put(key, image)
+        return image
+
+    def preview(self, size):
+        """
+        Returns the smallest stored thumbnail whose longest side covers the provided size, or the full resolution
+        image if none does
+        """
+        store = Services.get("ImageStore")
+        thumbnail_size = store.thumbnail_size(size) if self.image_hash else None
+        if thumbnail_size is None:
+            return self.image
+
+        key = (self.image_hash, thumbnail_size)
+        image = Image.decoded_images.get(key)
+        if image is None:
+            image = store.read_image(self.image_hash, thumbnail_size)
+            Image.decoded_images.put(key, image)
+        return image
+
+    def mip_level(self, size):
+        """
+        Returns the smallest level of the image's mip chain whose longest side covers the provided size. The chain
+        starts at the thumbnail (or full resolution image) covering the size, and each further level halves the one
+        before it. Levels are cached, so each one is only computed once
+        """
+        level = self.preview(size)
+        while max(level.size) // 2 >= size:
+            key = (self.cache_key, "mip", max(level.size) // 2)
+            smaller = Image.decoded_images.get(key)
+            if smaller is None:
+                smaller = level.reduce(2)
+                Image.decoded_images.put(key, smaller)
+            level = smaller
+        return level
+
+    def scaled(self, size):
+        """
+        Returns the image resized so its longest side is the provided size, resampled from the nearest larger mip
+        level rather than the full resolution image
+        """
+        level = self.mip_level(size)
+        return level.resize(fit_size(level.width, level.height, size))
         
+
+
+class SearchResult():
+    __slots__ = ("board_id", "item_id", "item_type", "title", "snippet", "score")
+
+    def __init__(self, board_id, item_id, item_type, title, snippet, score):
+        self.board_id = board_id
+        self.item_id = item_id
+        self.item_type = item_type
+        self.title = title
+        self.snippet = snippet
+        # bm25 score - lower is a better match
+        self.score = score
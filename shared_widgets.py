@@ -1,5 +1,8 @@
 from abc import abstractmethod
+from concurrent.futures import Future
+from datetime import date
 from enum import Enum
+from itertools import count
 import re
 import tkinter as tk
 from tkinter import messagebox
@@ -192,57 +195,176 @@ class SingleInputWindow:
         # txt_input.
 
 
-class BoardItemWidget(tk.Frame):
-    def __init__(self, canvas, width, height, item: BoardItem, **kwargs):
-        self.original_width = width
-        self.original_height = height
+class BoardItemView:
+    """
+    State and behaviour shared by every representation of a board item on a BoardCanvas - either a Tk widget
+    hosted in a canvas window item (BoardItemWidget), or canvas primitives drawn on it (see canvas_items.py).
+    Every canvas item of a board item carries the item's own tag and the shared "item" tag, so the canvas can move
+    all board items at once
+    """
+
+    # Ids used to give every board item a unique canvas tag
+    _ids = count()
+
+    # Level of detail tiers by zoom scale. Below BLOCK_SCALE items are drawn as flat coloured blocks, below
+    # CARD_SCALE as coloured cards showing only their title, and their full content is only drawn from CARD_SCALE up
+    BLOCK_SCALE = 0.7
+    CARD_SCALE = 0.9
+
+    def init_view(self, canvas, width, height, item: BoardItem):
         self.width = width
         self.height = height
         self.item = item
+        self.canvas = canvas
+        self.tag = f"item{next(BoardItemView._ids)}"
+
+        # The item's world position and unscaled size are kept in the canvas' ItemPositions store
+        canvas.item_positions.insert(
+            self, item.x * DEVICE_SCALE_FACTOR, item.y * DEVICE_SCALE_FACTOR, width, height
+        )
 
         self.scale_factor = 1
-        self.native_x = self.item.x * DEVICE_SCALE_FACTOR
-        self.native_y = self.item.y * DEVICE_SCALE_FACTOR
         self.scaled_x = self.native_x
         self.scaled_y = self.native_y
 
         self.prev_x = 0
         self.prev_y = 0
+        self.visible = False
+        self.dimmed = False
+        self.detail = "full"
 
         self.font_scale = int(11 * DEVICE_SCALE_FACTOR) + 2
 
-        super().__init__(canvas, width=width, height=height, **kwargs)
+    def update_detail(self):
+        # Switches the level of detail only when the scale crosses into another tier
+        if self.scale_factor < self.BLOCK_SCALE:
+            detail = "block"
+        elif self.scale_factor < self.CARD_SCALE:
+            detail = "card"
+        else:
+            detail = "full"
+        if detail != self.detail:
+            self.set_detail(detail)
 
-    def scale(self, factor=1.0):
-        self.scale_factor = factor
-        self.width = self.original_width * factor
-        self.height = self.original_height * factor
+    def set_detail(self, detail):
+        self.detail = detail
 
-        self.scale_content()
-        self.configure(width=self.width, height=self.height)
+    # The item's screen position. It is stored relative to the distance the canvas has moved every board item by
+    # (BoardCanvas.item_shift_x/y), so moving all items with one canvas call keeps each item's position current
+
+    @property
+    def scaled_x(self):
+        return self.placed_x + self.canvas.item_shift_x
+
+    @scaled_x.setter
+    def scaled_x(self, x):
+        self.placed_x = x - self.canvas.item_shift_x
+
+    @property
+    def scaled_y(self):
+        return self.placed_y + self.canvas.item_shift_y
+
+    @scaled_y.setter
+    def scaled_y(self, y):
+        self.placed_y = y - self.canvas.item_shift_y
 
     def show(self, x=None, y=None):
-        if x != None:
-            self.scaled_x = x
-        if y != None:
-            self.scaled_y = y
-        self.place(x=self.scaled_x, y=self.scaled_y)
+        # Moved by the distance to the new position so everything under the item's tag moves with one call
+        dx = 0 if x is None else x - self.scaled_x
+        dy = 0 if y is None else y - self.scaled_y
+        if dx or dy:
+            self.scaled_x += dx
+            self.scaled_y += dy
+            self.canvas.move(self.tag, dx, dy)
+        if not self.visible:
+            self.visible = True
+            self.update_state()
 
     def hide(self):
-        self.place_forget()
+        self.canvas.itemconfigure(self.tag, state="hidden")
+        self.visible = False
+
+    def update_state(self):
+        self.canvas.itemconfigure(self.tag, state="normal" if self.visible else "hidden")
+
+    # The item's unscaled world position and size, read from the canvas' ItemPositions store
+
+    @property
+    def native_x(self):
+        return self.canvas.item_positions.position(self)[0]
+
+    @property
+    def native_y(self):
+        return self.canvas.item_positions.position(self)[1]
+
+    @property
+    def original_width(self):
+        return self.canvas.item_positions.size(self)[0]
+
+    @property
+    def original_height(self):
+        return self.canvas.item_positions.size(self)[1]
+
+    def world_bounds(self):
+        # The item's unscaled (left, top, right, bottom) co-ordinates on the board
+        return self.canvas.item_positions.bounds(self)
 
     def displace(self, dx, dy):
         # self.hide()
-        self.item.x += dx / self.scale_factor
-        self.item.y += dy / self.scale_factor
-        self.scaled_x += dx
-        self.scaled_y += dy
-        self.show()
+        positions = self.canvas.item_positions
+        positions.move(self, dx / self.scale_factor, dy / self.scale_factor)
+        native_x, native_y = positions.position(self)
+        self.item.x = native_x / DEVICE_SCALE_FACTOR
+        self.item.y = native_y / DEVICE_SCALE_FACTOR
+        self.show(self.scaled_x + dx, self.scaled_y + dy)
+
+    @abstractmethod
+    def scale_content(self):
+        self.font_scale = int(10 * self.scale_factor) + 2
+
+    def set_colour(self, colour):
+        self.item.colour = colour
+        self.paint(self.display_colour())
 
-    def pan(self, dx, dy):
-        self.scaled_x += dx
-        self.scaled_y += dy
-        self.place(x=self.scaled_x, y=self.scaled_y)
+    def dim(self, dimmed=True):
+        # Greys out the item (e.g. when it does not match a tag filter) without changing its colour
+        if dimmed != self.dimmed:
+            self.dimmed = dimmed
+            self.paint(self.display_colour())
+
+    def display_colour(self):
+        if self.dimmed:
+            return utils.mix_colours(self.item.colour, GRAY, 0.6)
+        return self.item.colour
+
+    @abstractmethod
+    def paint(self, colour):
+        pass
+
+
+class BoardItemWidget(BoardItemView, tk.Frame):
+    def __init__(self, canvas, width, height, item: BoardItem, **kwargs):
+        self.init_view(canvas, width, height, item)
+
+        super().__init__(canvas, width=width, height=height, **kwargs)
+        # Hosted in a canvas window item rather than placed, so it moves with the canvas' other board items
+        self.window_item = canvas.create_window(
+            self.scaled_x,
+            self.scaled_y,
+            window=self,
+            anchor="nw",
+            state="hidden",
+            tags=(self.tag, "item"),
+        )
+
+    def scale(self, factor=1.0):
+        self.scale_factor = factor
+        self.width = self.original_width * factor
+        self.height = self.original_height * factor
+
+        self.update_detail()
+        self.scale_content()
+        self.configure(width=self.width, height=self.height)
 
     def highlight(self):
         self.configure(
@@ -255,14 +377,6 @@ class BoardItemWidget(tk.Frame):
         self.configure(highlightcolor=BLACK, highlightbackground=BLACK)
         self.after(10, lambda: self.configure(highlightthickness=2))
 
-    @abstractmethod
-    def scale_content(self):
-        self.font_scale = int(10 * self.scale_factor) + 2
-
-    @abstractmethod
-    def set_colour(self, colour):
-        self.item.colour = colour
-
 
 class NoteWidget(BoardItemWidget):
 
@@ -309,17 +423,36 @@ class NoteWidget(BoardItemWidget):
 
     def scale_content(self):
         super().scale_content()
-        self.title_label.config(font=("Commons", self.font_scale + 3, "bold"))
-        self.content_widget.config(font=("Dubai Medium", self.font_scale))
+        # Hidden parts are brought up to date when their level of detail is shown again
+        if self.detail != "block":
+            self.title_label.config(font=("Commons", self.font_scale + 3, "bold"))
+        if self.detail == "full":
+            self.content_widget.config(font=("Dubai Medium", self.font_scale))
+
+    def set_detail(self, detail):
+        super().set_detail(detail)
+        if detail == "block":
+            self.title_label.grid_remove()
+        else:
+            self.title_label.grid()
+        if detail == "full":
+            self.content_widget.grid()
+        else:
+            self.content_widget.grid_remove()
 
-    def set_colour(self, colour):
+    def paint(self, colour):
         self.configure(bg=colour)
         self.title_label.config(bg=colour)
         self.content_widget.configure(bg=colour)
-        super().set_colour(colour)
 
 
 class ImageWidget(BoardItemWidget):
+    # Scaled photo images of every image widget, keyed by (image, longest side). The zoom scales are discrete, so
+    # zooming back to a scale an image was already drawn at reuses its photo image instead of resampling again
+    photo_images = utils.LRUCache(
+        utils.get_setting("SCALED_IMAGE_CACHE_MB", 128) * 1024 * 1024,
+        sizeof=lambda photo: photo.width() * photo.height() * 4,
+    )
 
     def __init__(self, canvas, item: models.Image):
         width = 400 * DEVICE_SCALE_FACTOR
@@ -336,12 +469,17 @@ class ImageWidget(BoardItemWidget):
 
         max_size = 800 * DEVICE_SCALE_FACTOR
         self.img = None
+        # Resampling job for the size the image is being scaled to, if one is running
+        self.pending_resample: Future = None
+        self.pending_size = None
 
         # Set up grid
-        if item.image.width > max_size or item.image.height > max_size:
-            self.img = utils.resize_image(item.image, max_size)
+        # Stored images are drawn from the smallest thumbnail that covers the displayed size
+        image = item.preview(max_size)
+        if image.width > max_size or image.height > max_size:
+            self.img = utils.resize_image(image, max_size)
         else:
-            self.img = ImageTk.PhotoImage(item.image)
+            self.img = ImageTk.PhotoImage(image)
 
         self.largest_dimension = max(self.img.width(), self.img.height())
         w = int(self.img.width()) + 20 * self.scale_factor
@@ -356,26 +494,140 @@ class ImageWidget(BoardItemWidget):
             w / 2, h / 2, image=self.img, anchor="center", tag="image"
         )
 
-        self.original_width = w
-        self.original_height = h
+        self.canvas.item_positions.resize(self, w, h)
         self.width = w
         self.height = h
 
     def scale_content(self):
-        self.img = utils.resize_image(
-            self.item.image, int(self.largest_dimension * self.scale_factor)
-        )
+        size = int(self.largest_dimension * self.scale_factor)
+        if self.detail == "block":
+            self.cancel_resample()
+            self.draw_block(size)
+            return
+
+        photo = ImageWidget.photo_images.get((self.item.cache_key, size))
+        resampler = Services.get("ImageResampler")
+
+        if photo is None and resampler is None:
+            photo = self.photo_image(size)
+        elif photo is None:
+            # Show a quick low quality version (or keep the current one) until the resampled image is ready
+            self.request_photo_image(resampler, size)
+            photo = self.quick_photo_image(size) or self.img
+        else:
+            self.cancel_resample()
+
+        self.draw_image(photo, size)
+
+    def draw_image(self, photo, size):
+        self.img = photo
+        # Sized for the requested size, which a stale image waiting to be replaced may not have yet
+        image_width, image_height = utils.fit_size(photo.width(), photo.height(), size)
         self.image_canvas.delete("image")
-        w = int(self.img.width()) + 20 * self.scale_factor
-        h = int(self.img.height()) + 20 * self.scale_factor
+        w = int(image_width) + 20 * self.scale_factor
+        h = int(image_height) + 20 * self.scale_factor
         self.image_canvas.configure(width=w, height=h)
         self.image_canvas.create_image(
             w / 2, h / 2, image=self.img, anchor="center", tag="image"
         )
+        self.draw_dim_overlay()
 
-    def set_colour(self, colour):
+    def draw_block(self, size):
+        # Drawn as a flat block of the item's colour at the image's size, so nothing is resampled at small scales
+        image_width, image_height = utils.fit_size(self.img.width(), self.img.height(), size)
+        margin = 10 * self.scale_factor
+        self.image_canvas.delete("image")
+        w = int(image_width) + 2 * margin
+        h = int(image_height) + 2 * margin
+        self.image_canvas.configure(width=w, height=h)
+        self.image_canvas.create_rectangle(
+            margin,
+            margin,
+            w - margin,
+            h - margin,
+            fill=self.display_colour(),
+            outline="",
+            tags=("image", "block"),
+        )
+        self.draw_dim_overlay()
+
+    def request_photo_image(self, resampler, size):
+        if self.pending_size == size:
+            return
+        self.cancel_resample()
+        self.pending_size = size
+        self.pending_resample = resampler.submit(
+            self.item.scaled,
+            size,
+            callback=lambda future: self._photo_image_resampled(size, future),
+        )
+
+    def _photo_image_resampled(self, size, future: Future):
+        if future is not self.pending_resample:
+            return
+        self.pending_resample = None
+        self.pending_size = None
+
+        try:
+            image = future.result()
+        except Exception as e:
+            # Such as a missing or corrupt file in the image store - the current preview stays
+            print(f"Failed to resample image: {e}")
+            return
+        photo = ImageTk.PhotoImage(image)
+        ImageWidget.photo_images.put((self.item.cache_key, size), photo)
+        if self.winfo_exists():
+            self.draw_image(photo, size)
+
+    def cancel_resample(self):
+        if self.pending_resample is not None:
+            self.pending_resample.cancel()
+        self.pending_resample = None
+        self.pending_size = None
+
+    def quick_photo_image(self, size):
+        # Fast, low quality scaling of the smallest stored thumbnail. Not cached - it is replaced shortly
+        if self.item.image_hash is None:
+            return None
+        thumbnail = self.item.preview(1)
+        return ImageTk.PhotoImage(
+            thumbnail.resize(
+                utils.fit_size(thumbnail.width, thumbnail.height, size),
+                PILImage.BILINEAR,
+            )
+        )
+
+    def photo_image(self, size):
+        key = (self.item.cache_key, size)
+        photo = ImageWidget.photo_images.get(key)
+        if photo is None:
+            photo = ImageTk.PhotoImage(self.item.scaled(size))
+            ImageWidget.photo_images.put(key, photo)
+        return photo
+
+    def paint(self, colour):
         self.configure(bg=colour)
-        super().set_colour(colour)
+        self.image_canvas.itemconfigure("block", fill=colour)
+        self.draw_dim_overlay()
+
+    def destroy(self):
+        self.cancel_resample()
+        return super().destroy()
+
+    def draw_dim_overlay(self):
+        # Images cannot be recoloured, so dimmed images are covered with a stippled overlay instead
+        self.image_canvas.delete("dim")
+        if self.dimmed:
+            self.image_canvas.create_rectangle(
+                0,
+                0,
+                self.image_canvas.winfo_reqwidth(),
+                self.image_canvas.winfo_reqheight(),
+                fill=GRAY,
+                outline="",
+                stipple="gray50",
+                tags="dim",
+            )
 
 
 class PageWidget(BoardItemWidget):
@@ -423,14 +675,27 @@ class PageWidget(BoardItemWidget):
 
     def scale_content(self):
         super().scale_content()
-        self.title_label.config(font=("Commons", self.font_scale + 3, "bold"))
-        self.content_widget.config(font=("Dubai Medium", self.font_scale))
+        # Hidden parts are brought up to date when their level of detail is shown again
+        if self.detail != "block":
+            self.title_label.config(font=("Commons", self.font_scale + 3, "bold"))
+        if self.detail == "full":
+            self.content_widget.config(font=("Dubai Medium", self.font_scale))
+
+    def set_detail(self, detail):
+        super().set_detail(detail)
+        if detail == "block":
+            self.title_label.grid_remove()
+        else:
+            self.title_label.grid()
+        if detail == "full":
+            self.content_widget.grid()
+        else:
+            self.content_widget.grid_remove()
 
-    def set_colour(self, colour):
+    def paint(self, colour):
         self.configure(bg=colour)
         self.title_label.configure(bg=colour)
         self.content_widget.configure(bg=colour)
-        super().set_colour(colour)
 
 
 class OpenBoardWindow(tk.Toplevel):
@@ -515,10 +780,10 @@ class OpenBoardWindow(tk.Toplevel):
             width=scrollable_canvas.winfo_width() - 15,
         )
 
-        # Get boards currently not open
-        all_boards = db_service.get_boards()
+        # Get boards currently not open (board headers only - items are loaded when a board is opened)
+        all_boards = db_service.get_catalogue()
         unopened_boards = [
-            board for board in all_boards if board[0] not in th.get_open_board_ids()
+            board for board in all_boards if board.id not in th.get_open_board_ids()
         ]
 
         scrollbar_frame = tk.Frame(list_frame, width=15, bg=PRIMARY_COLOUR)
@@ -583,7 +848,7 @@ class OpenBoardWindow(tk.Toplevel):
                 font=utils.ctk_font(18),
                 bg=PRIMARY_COLOUR,
                 fg=BLACK,
-                text=board[1],
+                text=board.name,
             )
             self.label.grid(row=0, column=0, sticky="w")
             self.date_modified = tk.Label(
@@ -591,7 +856,7 @@ class OpenBoardWindow(tk.Toplevel):
                 font=utils.ctk_font(16),
                 bg=PRIMARY_COLOUR,
                 fg=GRAY,
-                text=board[2].strftime("%Y/%m/%d %H:%M"),
+                text=date.fromisoformat(str(board.date_created)[:10]).strftime("%Y/%m/%d"),
             )
             self.date_modified.grid(row=0, column=1, sticky="e")
             self.tk_image = utils.resize_image(
@@ -639,7 +904,7 @@ class OpenBoardWindow(tk.Toplevel):
                 font=utils.ctk_font(18),
             )
 
-            self.name = board[1]
+            self.name = board.name
             self.label.bind("<Double-1>", self.start_rename)
             self.entry.bind("<Return>", lambda event: self.process_rename(event))
             self.entry.bind("<Escape>", self.end_rename)
@@ -650,6 +915,20 @@ class OpenBoardWindow(tk.Toplevel):
                 lambda: self.process_rename(),
             )
 
+        def rename_saved(self, future, old_name):
+            if future.exception() is None:
+                return
+
+            # Show the name that is still saved
+            print(future.exception())
+            self.board.name = old_name
+            self.name = old_name
+            if self.label.winfo_exists():
+                self.label.configure(text=old_name)
+            messagebox.showerror(
+                "Database Error", f"The board could not be renamed. It is still called '{old_name}'."
+            )
+
         def start_rename(self, event=None):
             self.entry.delete(0, "end")
             self.entry.insert(0, self.name)
@@ -666,8 +945,15 @@ class OpenBoardWindow(tk.Toplevel):
             if self.name != "":
                 if re.match(r"^[a-zA-Z0-9_ ]+$", self.name):
                     if re.search(r"[a-zA-Z].*[a-zA-Z].*[a-zA-Z]", self.name):
+                        old_name = self.board.name
                         self.label.configure(text=self.name)
-                        # TODO: Asynchronously save new name to database
+                        self.board.name = self.name
+                        Services.get("DatabaseWorker").submit(
+                            "update_board_name",
+                            self.board.id,
+                            self.name,
+                            callback=lambda future: self.rename_saved(future, old_name),
+                        )
                     else:
                         messagebox.showerror(
                             "Invalid Name",
@@ -842,6 +1128,7 @@ class TagEditor(ctk.CTkFrame):
             self.item.tags.add(text)
             self.tag_list.add(text)
             self._add_tag_widet(text)
+            self._save_tag_change("add_tag", text)
 
     def _add_tag_widet(self, text):
         self.entry.pack_configure(pady=(5, 0))
@@ -876,8 +1163,6 @@ class TagEditor(ctk.CTkFrame):
         if self.entry.get():
             self.entry.delete(0, "end")
 
-        # TODO: immediately save changes to database
-
     def remove_tag(self, tag: "Tag"):
         if self.tag_list is None:
             raise ValueError("tag_list not set")
@@ -885,10 +1170,14 @@ class TagEditor(ctk.CTkFrame):
         if not tag in self.tag_widgets_list:
             raise ValueError(f"Tag '{tag}' not found in tag list")
 
-        self.tag_list.remove(tag.text)
-        self.item.tags.remove(tag.text)
-        self.tag_widgets_list.remove(tag)
+        # tag_list is the item's own set of tags
+        self.tag_list.discard(tag.text)
+        self.item.tags.discard(tag.text)
+        self._save_tag_change("remove_tag", tag.text)
+        self._remove_tag_widget(tag)
 
+    def _remove_tag_widget(self, tag: "Tag"):
+        self.tag_widgets_list.remove(tag)
         self.space_occupied -= tag.winfo_width() + self.gap
         if self.space_occupied < self.max_space:
             self.scrollbar.pack_forget()
@@ -899,6 +1188,44 @@ class TagEditor(ctk.CTkFrame):
 
         tag.destroy()
 
+    def _save_tag_change(self, method, text):
+        # Items that have not been inserted yet get their tags saved along with them
+        if self.item.item_id is not None:
+            item = self.item
+            Services.get("DatabaseWorker").submit(
+                method,
+                item.item_id,
+                text,
+                callback=lambda future: self._tag_change_saved(future, item, method, text),
+            )
+
+    def _tag_change_saved(self, future, item: models.BoardItem, method, text):
+        if future.exception() is None:
+            return
+
+        # The change was already shown, so it is undone on the item (and in the editor if it still shows the item)
+        print(future.exception())
+        shown = item is self.item and self.winfo_exists()
+        if method == "add_tag":
+            item.tags.discard(text)
+            if shown:
+                for tag in self.tag_widgets_list:
+                    if tag.text == text:
+                        self._remove_tag_widget(tag)
+                        break
+        else:
+            item.tags.add(text)
+            if shown:
+                self._add_tag_widet(text)
+
+        action = "added to" if method == "add_tag" else "removed from"
+        messagebox.showerror(
+            "Database Error", f"The tag '{text}' could not be {action} the item."
+        )
+
+    def filter_by_tag(self, text):
+        Services.get("BoardHandler").toggle_tag_filter(text)
+
     def set_item(self, item: models.BoardItem):
         self.item = item
 
@@ -930,12 +1257,14 @@ class TagEditor(ctk.CTkFrame):
             if len(text) < 4:
                 label.configure(width=3)
 
+            self.bind("<1>", lambda event: tag_editor.filter_by_tag(text))
+            label.bind("<1>", lambda event: tag_editor.filter_by_tag(text))
             self.bind("<3>", lambda event: tag_editor.remove_tag(self))
             label.bind("<3>", lambda event: tag_editor.remove_tag(self))
 
             self.tooltip = ToolTip(
                 label,
-                msg="Right-click to remove",
+                msg="Click to filter the board, right-click to remove",
                 delay=0.3,
                 bg=PRIMARY_COLOUR,
                 relief=tk.RAISED,
@@ -1020,9 +1349,9 @@ class MainSidePanelFrame(tk.Frame):
                     self.add_items_widgets,
                 ]
             case self.Contexts.ITEM:
-                if not isinstance(context_instance, BoardItemWidget):
+                if not isinstance(context_instance, BoardItemView):
                     raise ValueError(
-                        f"Context Menu: Context instance must be of type 'BoardItemWidget', not '{type(context_instance)}'"
+                        f"Context Menu: Context instance must be of type 'BoardItemView', not '{type(context_instance)}'"
                     )
                 self.clear()
 
@@ -1065,6 +1394,14 @@ class MainSidePanelFrame(tk.Frame):
                 parent, width=self.width, height=self.height, bg=PRIMARY_COLOUR
             )
 
+            # Incremental search
+            self.page_size = 20
+            self.query = ""
+            self.generation = 0
+            self.pending_search = None
+            self.results_exhausted = True
+            self._search_after_id = None
+
             def change_button_state(event):
 
                 def change_state():
@@ -1074,10 +1411,10 @@ class MainSidePanelFrame(tk.Frame):
                         search_button.configure(state="normal", image=icon)
 
                 event.widget.after(1, change_state)
+                self.schedule_search()
 
             def search_global(query: str):
-                # TODO: Use SQL to search through all text of items in database
-                print(query)
+                self.search(query)
 
             utils.make_label(
                 self,
@@ -1143,12 +1480,171 @@ class MainSidePanelFrame(tk.Frame):
             utils.set_defocus_on(window, self.search_bar, [self.search_bar._entry])
             self.search_bar.bind("<Key>", change_button_state)
 
+            # Search results - a scrollable list that is hidden while there are no results
+            self.results_area = tk.Frame(self, width=self.width, bg=PRIMARY_COLOUR)
+            self.results_area.rowconfigure(index=0, weight=1)
+            self.results_area.columnconfigure(index=0, weight=1)
+            self.results_area.columnconfigure(index=1, weight=0)
+
+            self.results_canvas = tk.Canvas(
+                self.results_area,
+                width=self.width - 15,
+                height=self.height * 1.5,
+                highlightthickness=0,
+                bg=PRIMARY_COLOUR,
+            )
+            self.results_canvas.grid(row=0, column=0, sticky="nsew")
+            self.results_frame = tk.Frame(self.results_canvas, bg=PRIMARY_COLOUR)
+            self.results_canvas.create_window(
+                (0, 0), window=self.results_frame, anchor="nw", width=self.width - 15
+            )
+            self.results_scrollbar = ctk.CTkScrollbar(
+                self.results_area,
+                orientation="vertical",
+                width=15,
+                command=self.results_canvas.yview,
+                button_color=LIGHT_BROWN,
+                button_hover_color=OLIVE_GREEN,
+                fg_color=PRIMARY_COLOUR,
+            )
+            self.results_scrollbar.grid(row=0, column=1, sticky="ns")
+            self.results_canvas.configure(yscrollcommand=self.on_results_scrolled)
+            self.result_options: list = []
+
+            def on_scroll(event):
+                self.results_canvas.yview_scroll(-int(event.delta / 120), "units")
+
+            self.results_canvas.bind(
+                "<Enter>", lambda e: self.results_canvas.bind_all("<MouseWheel>", on_scroll)
+            )
+            self.results_canvas.bind(
+                "<Leave>", lambda e: self.results_canvas.unbind_all("<MouseWheel>")
+            )
+
+        def schedule_search(self, delay=250):
+            """
+            Debounces keystrokes - the search only runs once typing has paused for 'delay' milliseconds
+            """
+            if self._search_after_id is not None:
+                self.after_cancel(self._search_after_id)
+            self._search_after_id = self.after(
+                delay, lambda: self.search(self.search_bar.get())
+            )
+
+        def search(self, query: str):
+            if self._search_after_id is not None:
+                self.after_cancel(self._search_after_id)
+                self._search_after_id = None
+
+            # Results of any earlier query still in flight are discarded
+            self.generation += 1
+            if self.pending_search is not None:
+                Services.get("DatabaseWorker").cancel(self.pending_search)
+                self.pending_search = None
+
+            self.query = query.strip()
+            self.clear_results()
+            if self.query:
+                self.request_results()
+
+        def request_results(self):
+            """
+            Requests the next page of results for the current query
+            """
+            generation = self.generation
+            self.pending_search = Services.get("DatabaseWorker").submit(
+                "search",
+                self.query,
+                self.page_size,
+                len(self.result_options),
+                callback=lambda future: self.show_results(future, generation),
+            )
+
+        def show_results(self, future, generation):
+            if generation != self.generation:
+                return
+            self.pending_search = None
+
+            try:
+                results = future.result()
+            except Exception as e:
+                # Such as a locked database - shown as no (further) results
+                print(f"Search failed: {e}")
+                results = []
+            self.results_exhausted = len(results) < self.page_size
+            for result in results:
+                self.result_options.append(
+                    self.ResultOption(self.results_frame, result, self.width - 15)
+                )
+
+            if self.result_options:
+                self.results_area.pack(side="top", fill="x", pady=(5, 0))
+            self.results_frame.update_idletasks()
+            self.results_canvas.configure(scrollregion=self.results_canvas.bbox("all"))
+
+        def clear_results(self):
+            for option in self.result_options:
+                option.destroy()
+            self.result_options = []
+            self.results_exhausted = True
+            self.results_canvas.yview_moveto(0)
+            self.results_area.pack_forget()
+
+        def on_results_scrolled(self, first, last):
+            self.results_scrollbar.set(first, last)
+
+            # Stream in the next page once the list is scrolled close to its end
+            if (
+                float(last) > 0.9
+                and not self.results_exhausted
+                and self.pending_search is None
+            ):
+                self.request_results()
+
         def show(self):
             self.pack(side="top", pady=(self.spacing, 0))
 
         def hide(self):
             self.pack_forget()
 
+        class ResultOption(tk.Frame):
+            def __init__(self, parent, result: models.SearchResult, width):
+                super().__init__(parent, bg=PRIMARY_COLOUR)
+                self.pack(side="top", fill="x", pady=(2, 0))
+
+                title = tk.Label(
+                    self,
+                    font=utils.ctk_font(16, True),
+                    bg=PRIMARY_COLOUR,
+                    fg=BLACK,
+                    text=result.title or result.item_type.capitalize(),
+                    anchor="w",
+                )
+                title.pack(side="top", fill="x")
+                snippet = tk.Label(
+                    self,
+                    font=utils.ctk_font(14),
+                    bg=PRIMARY_COLOUR,
+                    fg=GRAY,
+                    text=result.snippet,
+                    anchor="w",
+                    justify="left",
+                    wraplength=width,
+                )
+                snippet.pack(side="top", fill="x")
+
+                # Open the result's board when clicked
+                utils.add_bg_colour_hover_effect(
+                    widgets=(self, title, snippet), target_widgets=(self, title, snippet)
+                )
+                utils.set_bindings(
+                    "<1>",
+                    lambda e: Services.get("TabHandler").show_board(result.board_id),
+                    self,
+                    title,
+                    snippet,
+                )
+
     ### ========================================= ###
     ### ============= Board Options ============= ###
     ### ========================================= ###
@@ -1486,7 +1982,7 @@ class MainSidePanelFrame(tk.Frame):
         def __init__(self, parent, width, height, spacing):
             super().__init__(parent, width=width, height=height, bg=PRIMARY_COLOUR)
 
-            self.item: BoardItemWidget = None
+            self.item: BoardItemView = None
             self.spacing = spacing
             self.button_height = int(height * 0.56)
 
@@ -1556,18 +2052,19 @@ class MainSidePanelFrame(tk.Frame):
             self.current_colour_tile.swatch.configure(bg=colour)
             self.item.set_colour(colour)
 
-        def show(self, item: BoardItemWidget):
+        def show(self, item: BoardItemView):
+            # Named after the model, as notes and pages can be drawn either as widgets or as canvas items
             item_type = ""
-            item_type = type(item)
-            if item_type == NoteWidget:
+            item_type = type(item.item)
+            if item_type == models.Note:
                 item_type = "Note"
-            elif item_type == ImageWidget:
+            elif item_type == models.Image:
                 item_type = "Image"
-            elif item_type == PageWidget:
+            elif item_type == models.Page:
                 item_type = "Page"
             else:
                 raise ValueError(
-                    f"Colour Selector: Context instance should be a type of BoardItem, not '{type(item)}'"
+                    f"Colour Selector: Context instance should be a type of BoardItem, not '{type(item.item)}'"
                 )
 
             self.label.configure(text=f"Change {item_type} Colour")
@@ -1623,7 +2120,7 @@ class MainSidePanelFrame(tk.Frame):
 
             self.item = None
 
-        def show(self, item: BoardItemWidget):
+        def show(self, item: BoardItemView):
             self.set_item(item.item)
             self.pack(side="top", pady=(self.spacing, 0))
 
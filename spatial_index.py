@@ -0,0 +1,113 @@
+from math import floor
+
+"""
+The spatial_index file contains the SpatialGrid class, a uniform grid hash over rectangles in world co-ordinates.
+The BoardCanvas uses it to find the board items inside an area (such as the visible part of the board) or under
+a point without walking through every item on the board.
+"""
+
+
+class SpatialGrid:
+    def __init__(self, cell_size=512):
+        """
+        Each rectangle is registered in every grid cell it overlaps. Queries only visit the cells covering the
+        requested area, so their cost depends on how many items are nearby rather than on the size of the board
+        """
+        self.cell_size = cell_size
+        self._cells: dict[tuple[int, int], set] = {}
+        self._bounds: dict = {}
+        self._cell_ranges: dict = {}
+
+    def insert(self, key, left, top, right, bottom):
+        if key in self._bounds:
+            self.update(key, left, top, right, bottom)
+            return
+
+        cell_range = self._cell_range(left, top, right, bottom)
+        self._bounds[key] = (left, top, right, bottom)
+        self._cell_ranges[key] = cell_range
+        for cell in self._cells_in(*cell_range):
+            self._cells.setdefault(cell, set()).add(key)
+
+    def update(self, key, left, top, right, bottom):
+        if key not in self._bounds:
+            self.insert(key, left, top, right, bottom)
+            return
+
+        self._bounds[key] = (left, top, right, bottom)
+        cell_range = self._cell_range(left, top, right, bottom)
+        if cell_range == self._cell_ranges[key]:
+            # Still overlaps the same cells - nothing to re-register
+            return
+
+        self._remove_from_cells(key)
+        self._cell_ranges[key] = cell_range
+        for cell in self._cells_in(*cell_range):
+            self._cells.setdefault(cell, set()).add(key)
+
+    def remove(self, key):
+        if key not in self._bounds:
+            raise ValueError(f"'{key}' is not in the spatial index")
+
+        self._remove_from_cells(key)
+        del self._bounds[key]
+        del self._cell_ranges[key]
+
+    def query_rect(self, left, top, right, bottom):
+        """
+        Returns the set of keys whose rectangles intersect the provided rectangle
+        """
+        found = set()
+        for cell in self._cells_in(*self._cell_range(left, top, right, bottom)):
+            for key in self._cells.get(cell, ()):
+                if key in found:
+                    continue
+                k_left, k_top, k_right, k_bottom = self._bounds[key]
+                if k_left < right and k_right > left and k_top < bottom and k_bottom > top:
+                    found.add(key)
+        return found
+
+    def query_point(self, x, y):
+        """
+        Returns the set of keys whose rectangles contain the provided point
+        """
+        found = set()
+        cell = (floor(x / self.cell_size), floor(y / self.cell_size))
+        for key in self._cells.get(cell, ()):
+            left, top, right, bottom = self._bounds[key]
+            if left <= x < right and top <= y < bottom:
+                found.add(key)
+        return found
+
+    def clear(self):
+        self._cells.clear()
+        self._bounds.clear()
+        self._cell_ranges.clear()
+
+    def _cell_range(self, left, top, right, bottom):
+        size = self.cell_size
+        return (
+            floor(left / size),
+            floor(top / size),
+            floor(right / size),
+            floor(bottom / size),
+        )
+
+    def _cells_in(self, first_col, first_row, last_col, last_row):
+        for col in range(first_col, last_col + 1):
+            for row in range(first_row, last_row + 1):
+                yield (col, row)
+
+    def _remove_from_cells(self, key):
+        for cell in self._cells_in(*self._cell_ranges[key]):
+            keys = self._cells.get(cell)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._cells[cell]
+
+    def __contains__(self, key):
+        return key in self._bounds
+
+    def __len__(self):
+        return len(self._bounds)
@@ -1,5 +1,7 @@
 import random
+import threading
 import json
+from collections import OrderedDict
 from io import BytesIO
 from typing import List, Union, Iterable
 from PIL import Image, ImageTk
@@ -14,8 +16,70 @@ __all__ = ["_create_mock_data"]
 with open("app_settings.json", "r") as f:
     settings = json.load(f)
 
-def resize_image(image: Image.Image, maximum_size: int):
-    aspect_ratio = image.width / image.height
+class LRUCache:
+    """
+    Least-recently-used cache bounded by the combined size of its values.
+    'sizeof' returns the size of a single value - by default every value has a size of 1, making max_size an entry limit.
+    Safe to share between threads
+    """
+
+    def __init__(self, max_size: int, sizeof=None):
+        self.max_size = max_size
+        self.size = 0
+        self._sizeof = sizeof or (lambda value: 1)
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self.pop(key)
+            self._entries[key] = value
+            self.size += self._sizeof(value)
+
+            # Evict least-recently-used entries, but always keep the newest one
+            while self.size > self.max_size and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= self._sizeof(evicted)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                return default
+            value = self._entries.pop(key)
+            self.size -= self._sizeof(value)
+            return value
+
+    def pop_matching(self, predicate):
+        """
+        Removes every entry whose key satisfies the predicate
+        """
+        with self._lock:
+            for key in [key for key in self._entries if predicate(key)]:
+                self.pop(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+def fit_size(width, height, maximum_size: int):
+    # The (width, height) of an image scaled so its longest side is maximum_size
+    aspect_ratio = width / height
 
     if aspect_ratio >= 1:
         # Width > Height
@@ -26,7 +90,10 @@ def resize_image(image: Image.Image, maximum_size: int):
         image_height = maximum_size
         image_width = int(image_height * aspect_ratio)
 
-    return ImageTk.PhotoImage(image.resize((image_width, image_height)))
+    return image_width, image_height
+
+def resize_image(image: Image.Image, maximum_size: int):
+    return ImageTk.PhotoImage(image.resize(fit_size(image.width, image.height, maximum_size)))
 
 def get_setting(setting: str, default=None):
     return settings.get(setting, default)
@@ -62,6 +129,10 @@ def bytes_to_image(image_bytes):
     pil_image = Image.open(input_stream)
     return pil_image
 
+def image_size_in_bytes(image: Image.Image):
+    # Approximate memory used by the decoded pixels of a PIL image
+    return image.width * image.height * len(image.getbands())
+
 def _create_test_image_bytes():
     img = Image.new("RGB", (100, 100), color="red")
     img_byte_arr = BytesIO()
@@ -178,6 +249,13 @@ def adjust_brightness(hex_colour, factor=0):
     # Convert back to hex
     return "#{:02x}{:02x}{:02x}".format(*adjusted_rgb)
 
+def mix_colours(hex_colour, other_hex_colour, amount=0.5):
+    # Blends 'amount' (0 to 1) of the other colour into the first colour
+    rgb = (int(hex_colour.lstrip("#")[i : i + 2], 16) for i in (0, 2, 4))
+    other_rgb = (int(other_hex_colour.lstrip("#")[i : i + 2], 16) for i in (0, 2, 4))
+    mixed_rgb = (int(c + (o - c) * amount) for c, o in zip(rgb, other_rgb))
+    return "#{:02x}{:02x}{:02x}".format(*mixed_rgb)
+
 def ctk_font(size: int = 16, bold: bool = False):
     return ctk.CTkFont(family="Helvetica", size=size, weight="bold" if bold else None)
 
@@ -0,0 +1,64 @@
+"""
+The view_transform file contains the ViewTransform class, the mapping between board (world) co-ordinates and
+canvas (screen) co-ordinates used by the BoardCanvas. Board items only store their world co-ordinates, and their
+screen positions are projected through the transform whenever they are needed.
+"""
+
+
+class ViewTransform:
+    def __init__(self, scale=1.0, x=0.0, y=0.0):
+        """
+        An affine transform made of a uniform scale and a translation: screen = world * scale + (x, y).
+        Zooming and panning only change these three values, so positions are always derived from world
+        co-ordinates instead of being adjusted incrementally (which accumulates rounding errors)
+        """
+        self.scale = scale
+        self.x = x
+        self.y = y
+
+    def to_screen(self, x, y):
+        return (x * self.scale + self.x, y * self.scale + self.y)
+
+    def to_world(self, x, y):
+        return ((x - self.x) / self.scale, (y - self.y) / self.scale)
+
+    def rect_to_screen(self, left, top, right, bottom):
+        return (*self.to_screen(left, top), *self.to_screen(right, bottom))
+
+    def rect_to_world(self, left, top, right, bottom):
+        return (*self.to_world(left, top), *self.to_world(right, bottom))
+
+    def translate(self, dx, dy):
+        self.x += dx
+        self.y += dy
+
+    def zoom_at(self, scale, x, y):
+        """
+        Changes the scale while keeping the world point under the screen point (x, y) in place
+        """
+        world_x, world_y = self.to_world(x, y)
+        self.scale = scale
+        self.x = x - world_x * scale
+        self.y = y - world_y * scale
+
+    def clamp(self, bounds, width, height):
+        """
+        Translates the view so the world rectangle bounds (left, top, right, bottom) covers the whole screen area
+        of the provided width and height, where it can. Returns the (dx, dy) translation that was applied
+        """
+        left, top, right, bottom = self.rect_to_screen(*bounds)
+
+        dx = 0
+        if left > 0:
+            dx = -left
+        elif right < width:
+            dx = width - right
+
+        dy = 0
+        if top > 0:
+            dy = -top
+        elif bottom < height:
+            dy = height - bottom
+
+        self.translate(dx, dy)
+        return dx, dy